@@ -1,33 +1,156 @@
 import sqlite3
 import os
-from datetime import datetime
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
 import json
+from collections import Counter, defaultdict
+from hyperloglog import HyperLogLog
+
+
+# Sketch key standing for "all guides" or "all days"
+ALL_SKETCH_KEY = "*"
+
+# Columns of guide_views, which holds a row per view in "exact" mode
+GUIDE_VIEWS_COLUMNS = '''(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guide_slug TEXT NOT NULL,
+    client_id TEXT NOT NULL,
+    ip_address TEXT,
+    user_agent TEXT,
+    viewed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)'''
 
 
 class ViewTracker:
-    def __init__(self, db_path: str = "view_stats.db"):
+    def __init__(self, db_path: str = "view_stats.db", busy_timeout: float = 5.0, cached_statements: int = 128,
+                 unique_mode: str = "exact", hll_precision: int = 12):
         self.db_path = db_path
-        self.init_database()
+        # Both modes count every view. "exact" stores each view and every
+        # (guide, client) pair and counts unique viewers from those; "hll" stores
+        # no client ids and estimates unique viewers with HyperLogLog sketches
+        # of bounded size
+        self.approximate_uniques = unique_mode == "hll"
+        self.hll_precision = hll_precision
+        self.busy_timeout = busy_timeout
+        self.cached_statements = cached_statements
+        # Each thread keeps its own long-lived connection
+        self.local = threading.local()
+        self.connections = []
+        self.connections_lock = threading.Lock()
+        # Bumped by close() so threads reconnect instead of using a closed connection
+        self.generation = 0
+        # Write-behind view ingestion, see start_writer()
+        self.view_queue = None
+        self.writer_thread = None
+        self.ingestion_lock = threading.Lock()
+        self.ingestion_stats = {"written": 0, "duplicates": 0, "dropped": 0, "failed": 0, "batches": 0}
+        # The schema is set up on first use, so constructing a tracker (e.g. in a
+        # process that imports the server only to build guides) doesn't touch the database
+        self.initialized = False
+        self.initializing = False
+        self.init_lock = threading.RLock()
+
+    def get_connection(self) -> sqlite3.Connection:
+        """
+        Get the calling thread's connection, opening it on first use
+        Use it as a context manager to commit or roll back a transaction
+        """
+        conn = getattr(self.local, "conn", None)
+        if conn is not None and self.local.generation == self.generation:
+            return conn
+
+        # check_same_thread is off only so close() can close every thread's connection;
+        # each connection is still used by a single thread
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout,
+                               cached_statements=self.cached_statements, check_same_thread=False)
+        # WAL lets readers run alongside the writer; NORMAL skips the fsync per commit
+        # and is still safe against corruption in WAL mode
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+
+        with self.connections_lock:
+            # Close connections left behind by threads that have exited
+            alive = []
+            for thread, thread_conn in self.connections:
+                if thread.is_alive():
+                    alive.append((thread, thread_conn))
+                else:
+                    thread_conn.close()
+            alive.append((threading.current_thread(), conn))
+            self.connections = alive
+        self.local.conn = conn
+        self.local.generation = self.generation
+        self.initialize()
+        return conn
+
+    def initialize(self):
+        """Create or migrate the schema once, before the database is first used"""
+        if self.initialized:
+            return
+        with self.init_lock:
+            # init_database's own connection comes back through here
+            if self.initialized or self.initializing:
+                return
+            self.initializing = True
+            try:
+                self.init_database()
+                self.initialized = True
+            finally:
+                self.initializing = False
+
+    def close(self):
+        """Close every thread's connection, checkpointing the WAL into the database file"""
+        with self.connections_lock:
+            self.generation += 1
+            for _, conn in self.connections:
+                try:
+                    conn.close()
+                except sqlite3.Error as e:
+                    print(f"❌ Error closing database connection: {e}")
+            self.connections = []
 
     def init_database(self):
         """Initialize the database with required tables"""
-        with sqlite3.connect(self.db_path) as conn:
+        conn = self.get_connection()
+        # Pages freed by prune_views only go back to the file system with incremental
+        # auto-vacuum, which an existing database can only switch to with a VACUUM
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2 and not conn.in_transaction:
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('VACUUM')
+            print("🧹 Enabled incremental vacuum for the view database")
+
+        with conn:
             cursor = conn.cursor()
 
-            # Create guide_views table
+            # Settings the stored counts depend on, and the counter generation
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS guide_views (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guide_slug TEXT NOT NULL,
-                    client_id TEXT NOT NULL,
-                    ip_address TEXT,
-                    user_agent TEXT,
-                    viewed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(guide_slug, client_id)
+                CREATE TABLE IF NOT EXISTS view_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
                 )
             ''')
+            previous_mode = self.get_stored_mode(cursor)
+
+            # Create guide_views table
+            cursor.execute(f'CREATE TABLE IF NOT EXISTS guide_views {GUIDE_VIEWS_COLUMNS}')
+
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'guide_views'")
+            if "UNIQUE" in cursor.fetchone()[0]:
+                # guide_views used to keep only each client's first view of a guide
+                cursor.execute(f'CREATE TABLE guide_views_new {GUIDE_VIEWS_COLUMNS}')
+                cursor.execute('''
+                    INSERT INTO guide_views_new (id, guide_slug, client_id, ip_address, user_agent, viewed_at)
+                    SELECT id, guide_slug, client_id, ip_address, user_agent, viewed_at FROM guide_views
+                ''')
+                # Takes the table's old triggers and indexes with it
+                cursor.execute('DROP TABLE guide_views')
+                cursor.execute('ALTER TABLE guide_views_new RENAME TO guide_views')
+                print("📊 Migrated guide_views to store every view")
 
             # Create indexes for performance
             cursor.execute('''
@@ -45,8 +168,467 @@ class ViewTracker:
                 ON guide_views(ip_address)
             ''')
 
+            # Every (guide, client) seen in "exact" mode, so a returning client isn't
+            # counted as a new viewer again, even after its views have been pruned
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'guide_viewers'")
+            backfill_viewers = cursor.fetchone() is None
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS guide_viewers (
+                    guide_slug TEXT NOT NULL,
+                    client_id TEXT NOT NULL,
+                    PRIMARY KEY (guide_slug, client_id)
+                ) WITHOUT ROWID
+            ''')
+            if backfill_viewers:
+                cursor.execute('''
+                    INSERT OR IGNORE INTO guide_viewers (guide_slug, client_id)
+                    SELECT guide_slug, client_id FROM guide_views
+                ''')
+
+            self.init_rollups(cursor, previous_mode)
+            self.init_timeseries(cursor)
+            if self.approximate_uniques:
+                self.init_sketches(cursor)
+                # Only needed to fill the sketches; client ids aren't kept in "hll" mode
+                cursor.execute('DELETE FROM guide_viewers')
+            else:
+                # Sketches go stale while they aren't updated, so rebuild them next time
+                cursor.execute('DROP TABLE IF EXISTS view_sketches')
+
+            self.set_meta(cursor, "unique_mode", "hll" if self.approximate_uniques else "exact")
             conn.commit()
 
+    def get_stored_mode(self, cursor: sqlite3.Cursor) -> Optional[str]:
+        """The unique viewer mode the database was last used in, None for a new database"""
+        cursor.execute("SELECT value FROM view_meta WHERE key = 'unique_mode'")
+        row = cursor.fetchone()
+        if row:
+            return row[0]
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('view_totals', 'view_sketches')")
+        tables = {name for (name,) in cursor.fetchall()}
+        if "view_totals" not in tables:
+            return None
+        # Written before the mode was recorded; only "hll" mode keeps sketches
+        return "hll" if "view_sketches" in tables else "exact"
+
+    def set_meta(self, cursor: sqlite3.Cursor, key: str, value: str):
+        cursor.execute('''
+            INSERT INTO view_meta (key, value) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        ''', (key, value))
+
+    def bump_counter_generation(self, cursor: sqlite3.Cursor):
+        """Mark the counters as rewritten, so versions from get_view_version change"""
+        cursor.execute('''
+            INSERT INTO view_meta (key, value) VALUES ('counter_generation', '1')
+            ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+        ''')
+
+    def rebuild_counters(self, cursor: sqlite3.Cursor):
+        """Recount every counter and (guide, client) pair from the views stored in guide_views"""
+        cursor.execute('DELETE FROM guide_viewers')
+        cursor.execute('''
+            INSERT INTO guide_viewers (guide_slug, client_id)
+            SELECT DISTINCT guide_slug, client_id FROM guide_views
+        ''')
+        # Replaces whatever the triggers on the inserts above counted
+        cursor.execute('DELETE FROM guide_view_counts')
+        cursor.execute('DELETE FROM view_clients')
+        cursor.execute('''
+            INSERT INTO guide_view_counts (guide_slug, total_views, unique_viewers)
+            SELECT guide_slug, COUNT(*), COUNT(DISTINCT client_id)
+            FROM guide_views
+            GROUP BY guide_slug
+        ''')
+        cursor.execute('''
+            INSERT INTO view_clients (client_id)
+            SELECT DISTINCT client_id FROM guide_views
+        ''')
+        cursor.execute('''
+            INSERT OR REPLACE INTO view_totals (id, total_views, unique_viewers)
+            SELECT 1, (SELECT COUNT(*) FROM guide_views), (SELECT COUNT(*) FROM view_clients)
+        ''')
+        self.bump_counter_generation(cursor)
+
+    def init_rollups(self, cursor: sqlite3.Cursor, previous_mode: Optional[str] = None):
+        """
+        Create the view counter tables and the triggers that maintain them
+        Counters are updated in the same transaction as the views they count,
+        so stats reads are single-row lookups instead of scans of guide_views
+        """
+        # Per-guide counters
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS guide_view_counts (
+                guide_slug TEXT PRIMARY KEY,
+                total_views INTEGER NOT NULL DEFAULT 0,
+                unique_viewers INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+
+        # Every client that viewed any guide, for the global unique viewer count
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS view_clients (
+                client_id TEXT PRIMARY KEY
+            )
+        ''')
+
+        # Global counters, in a single row
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS view_totals (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                total_views INTEGER NOT NULL DEFAULT 0,
+                unique_viewers INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+
+        # Triggers are recreated on every start so their definitions stay current
+        # View counts are added by record_views, not by triggers on guide_views
+        cursor.execute('DROP TRIGGER IF EXISTS trg_guide_views_counts')
+        cursor.execute('DROP TRIGGER IF EXISTS trg_guide_views_clients')
+        cursor.execute('DROP TRIGGER IF EXISTS trg_guide_views_dedupe')
+        cursor.execute('DROP TRIGGER IF EXISTS trg_guide_viewers_counts')
+
+        if self.approximate_uniques:
+            # Sketches count global unique viewers, so the client list isn't kept
+            cursor.execute('DELETE FROM view_clients')
+        else:
+            # Only fires for clients that hadn't viewed the guide before
+            cursor.execute('''
+                CREATE TRIGGER trg_guide_viewers_counts
+                AFTER INSERT ON guide_viewers
+                BEGIN
+                    INSERT INTO guide_view_counts (guide_slug, unique_viewers)
+                    VALUES (NEW.guide_slug, 1)
+                    ON CONFLICT(guide_slug) DO UPDATE SET unique_viewers = unique_viewers + 1;
+                    INSERT OR IGNORE INTO view_clients (client_id) VALUES (NEW.client_id);
+                END
+            ''')
+
+        # Only fires for clients that weren't seen before
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_view_clients_totals
+            AFTER INSERT ON view_clients
+            BEGIN
+                UPDATE view_totals SET unique_viewers = unique_viewers + 1 WHERE id = 1;
+            END
+        ''')
+
+        # Backfill from existing views the first time the counters are created
+        cursor.execute('SELECT 1 FROM view_totals WHERE id = 1')
+        if cursor.fetchone() is None:
+            self.rebuild_counters(cursor)
+            print("📊 Initialized view counters from existing views")
+        elif not self.approximate_uniques and previous_mode == "hll":
+            # Views counted in "hll" mode left no client ids to count unique viewers
+            # from, so total views and unique viewers both restart from the views
+            # stored in guide_views, rather than counting different sets of views
+            self.rebuild_counters(cursor)
+            print("⚠️ Switched to exact unique viewers: view counters were rebuilt "
+                  "from stored views, leaving out views counted in hll mode")
+
+    def init_timeseries(self, cursor: sqlite3.Cursor):
+        """
+        Create the hourly and daily view count tables, filled by record_views
+        Buckets are keyed by the leading "YYYY-MM-DD HH" / "YYYY-MM-DD" of viewed_at
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'guide_views_daily'")
+        backfill = cursor.fetchone() is None
+
+        for table, column in (("guide_views_hourly", "hour"), ("guide_views_daily", "day")):
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {table} (
+                    guide_slug TEXT NOT NULL,
+                    {column} TEXT NOT NULL,
+                    views INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY ({column}, guide_slug)
+                )
+            ''')
+
+        cursor.execute('DROP TRIGGER IF EXISTS trg_guide_views_timeseries')
+
+        if backfill:
+            cursor.execute('''
+                INSERT INTO guide_views_hourly (guide_slug, hour, views)
+                SELECT guide_slug, substr(viewed_at, 1, 13), COUNT(*)
+                FROM guide_views
+                GROUP BY guide_slug, substr(viewed_at, 1, 13)
+            ''')
+            cursor.execute('''
+                INSERT INTO guide_views_daily (guide_slug, day, views)
+                SELECT guide_slug, substr(viewed_at, 1, 10), COUNT(*)
+                FROM guide_views
+                GROUP BY guide_slug, substr(viewed_at, 1, 10)
+            ''')
+            print("📊 Initialized hourly and daily view counts from existing views")
+
+    def get_timeseries(self, interval: str = "day", guide_slug: Optional[str] = None,
+                       start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, any]]:
+        """
+        Views per hour or per day, oldest first, for one guide or summed over all guides
+        start and end are inclusive bucket keys ("YYYY-MM-DD" or "YYYY-MM-DD HH")
+        """
+        table, column = ("guide_views_hourly", "hour") if interval == "hour" else ("guide_views_daily", "day")
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                # An end day covers every hour of that day
+                cursor.execute(f'''
+                    SELECT {column}, SUM(views) FROM {table}
+                    WHERE {column} >= ? AND {column} <= ?
+                    AND (? IS NULL OR guide_slug = ?)
+                    GROUP BY {column}
+                    ORDER BY {column}
+                ''', (start or "", (end or "9999-12-31") + "~", guide_slug, guide_slug))
+                return [{"bucket": bucket, "views": views} for bucket, views in cursor.fetchall()]
+
+        except Exception as e:
+            print(f"❌ Error getting view timeseries: {e}")
+            return []
+
+    def prune_views(self, retention_days: int, batch_size: int = 5000) -> int:
+        """
+        Delete raw views, hourly counts and per-day sketches older than retention_days
+        Daily counts, totals and all-time unique viewer counts are kept. In
+        "exact" mode guide_viewers keeps every (guide, client) pair, which is what
+        stops a returning client from being counted again, so it grows with the
+        number of unique viewers. Freed pages are returned to the file system.
+        Returns the number of views deleted.
+        """
+        cutoff = datetime.now() - timedelta(days=retention_days)
+        pruned = 0
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                # Small transactions so the view writer isn't locked out for long
+                while True:
+                    cursor.execute('''
+                        DELETE FROM guide_views
+                        WHERE id IN (SELECT id FROM guide_views WHERE viewed_at < ? LIMIT ?)
+                    ''', (cutoff, batch_size))
+                    conn.commit()
+                    pruned += cursor.rowcount
+                    if cursor.rowcount < batch_size:
+                        break
+
+                # The daily counts are kept up to date alongside the hourly ones,
+                # so nothing needs rolling up before the hours are dropped
+                cursor.execute('DELETE FROM guide_views_hourly WHERE hour < ?',
+                               (cutoff.strftime("%Y-%m-%d %H"),))
+                if self.approximate_uniques:
+                    cursor.execute('DELETE FROM view_sketches WHERE day != ? AND day < ?',
+                                   (ALL_SKETCH_KEY, cutoff.strftime("%Y-%m-%d")))
+                conn.commit()
+                # execute() would only step the pragma once, freeing a single page
+                conn.executescript('PRAGMA incremental_vacuum;')
+
+            if pruned:
+                print(f"🧹 Pruned {pruned} views older than {retention_days} days")
+            return pruned
+
+        except Exception as e:
+            print(f"❌ Error pruning views: {e}")
+            return pruned
+
+    def init_sketches(self, cursor: sqlite3.Cursor):
+        """
+        Create the HyperLogLog sketch table, filling it from existing views
+        Sketches are kept per (guide, day), per guide, per day and globally,
+        with ALL_SKETCH_KEY in place of the guide or day
+        """
+        cursor.execute("PRAGMA table_info(view_sketches)")
+        columns = [row[1] for row in cursor.fetchall()]
+        if columns and "precision" not in columns:
+            # Written before precision was recorded, while every view was still in guide_views
+            cursor.execute('DROP TABLE view_sketches')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS view_sketches (
+                guide_slug TEXT NOT NULL,
+                day TEXT NOT NULL,
+                precision INTEGER NOT NULL,
+                sketch BLOB NOT NULL,
+                PRIMARY KEY (guide_slug, day)
+            )
+        ''')
+
+        cursor.execute('SELECT 1 FROM view_sketches WHERE guide_slug = ? AND day = ?',
+                       (ALL_SKETCH_KEY, ALL_SKETCH_KEY))
+        if cursor.fetchone() is None:
+            cursor.execute('SELECT guide_slug, client_id, substr(viewed_at, 1, 10) FROM guide_views')
+            views = cursor.fetchall()
+            # Viewers whose views were pruned only count towards the all-time sketches
+            cursor.execute('SELECT guide_slug, client_id, NULL FROM guide_viewers')
+            self.update_sketches(cursor, views + cursor.fetchall())
+            self.bump_counter_generation(cursor)
+            print("📊 Initialized unique viewer sketches from existing views")
+
+        # Client ids aren't stored, so sketches can only be folded down to a lower precision
+        cursor.execute('SELECT guide_slug, day, sketch FROM view_sketches WHERE precision > ?',
+                       (self.hll_precision,))
+        folded = cursor.fetchall()
+        for guide_slug, day, data in folded:
+            self.write_sketch(cursor, guide_slug, day, HyperLogLog.from_bytes(data).fold(self.hll_precision))
+        if folded:
+            # Folding can change the estimates written to the counters below
+            self.bump_counter_generation(cursor)
+            print(f"📊 Folded {len(folded)} unique viewer sketches to precision {self.hll_precision}")
+        cursor.execute('SELECT COUNT(*), MIN(precision) FROM view_sketches WHERE precision < ?',
+                       (self.hll_precision,))
+        lower, lowest = cursor.fetchone()
+        if lower:
+            print(f"⚠️ {lower} unique viewer sketches stay at precision {lowest}, "
+                  f"below HLL_PRECISION={self.hll_precision}")
+
+        # Counters hold the estimates, which may have been exact counts before
+        cursor.execute('SELECT guide_slug, sketch FROM view_sketches WHERE day = ?', (ALL_SKETCH_KEY,))
+        for guide_slug, data in cursor.fetchall():
+            self.set_unique_viewers(cursor, guide_slug, HyperLogLog.from_bytes(data).count())
+
+    def write_sketch(self, cursor: sqlite3.Cursor, guide_slug: str, day: str, sketch: HyperLogLog):
+        cursor.execute('''
+            INSERT INTO view_sketches (guide_slug, day, precision, sketch) VALUES (?, ?, ?, ?)
+            ON CONFLICT(guide_slug, day) DO UPDATE SET
+                precision = excluded.precision,
+                sketch = excluded.sketch
+        ''', (guide_slug, day, sketch.precision, sketch.to_bytes()))
+
+    def set_unique_viewers(self, cursor: sqlite3.Cursor, guide_slug: str, unique_viewers: int):
+        """Store a unique viewer estimate in the counter read by the stats methods"""
+        if guide_slug == ALL_SKETCH_KEY:
+            cursor.execute('UPDATE view_totals SET unique_viewers = ? WHERE id = 1', (unique_viewers,))
+        else:
+            cursor.execute('''
+                INSERT INTO guide_view_counts (guide_slug, unique_viewers) VALUES (?, ?)
+                ON CONFLICT(guide_slug) DO UPDATE SET unique_viewers = excluded.unique_viewers
+            ''', (guide_slug, unique_viewers))
+
+    def update_sketches(self, cursor: sqlite3.Cursor, views: List[tuple]):
+        """
+        Add (guide_slug, client_id, day) views to every sketch they belong to
+        Views with a None day are only added to the all-time sketches. The
+        all-time estimates are written to the unique viewer counters
+        """
+        clients_by_key = defaultdict(set)
+        for guide_slug, client_id, day in views:
+            keys = [(guide_slug, ALL_SKETCH_KEY), (ALL_SKETCH_KEY, ALL_SKETCH_KEY)]
+            if day is not None:
+                keys += [(guide_slug, day), (ALL_SKETCH_KEY, day)]
+            for key in keys:
+                clients_by_key[key].add(client_id)
+
+        for (guide_slug, day), client_ids in clients_by_key.items():
+            cursor.execute('SELECT sketch FROM view_sketches WHERE guide_slug = ? AND day = ?',
+                           (guide_slug, day))
+            row = cursor.fetchone()
+            sketch = HyperLogLog.from_bytes(row[0]) if row else HyperLogLog(self.hll_precision)
+            if sketch.precision > self.hll_precision:
+                sketch = sketch.fold(self.hll_precision)
+            sketch.update(client_ids)
+            self.write_sketch(cursor, guide_slug, day, sketch)
+            if day == ALL_SKETCH_KEY:
+                self.set_unique_viewers(cursor, guide_slug, sketch.count())
+
+    def record_views(self, cursor: sqlite3.Cursor, views: List[tuple]) -> Optional[int]:
+        """
+        Count views in the counters, time series and unique viewer records
+        views are (guide_slug, client_id, ip_address, user_agent, viewed_at) tuples
+        Returns how many views were a client's first view of a guide, or None
+        in "hll" mode, where that isn't known
+        """
+        views_by_guide = Counter(view[0] for view in views)
+        cursor.executemany('''
+            INSERT INTO guide_view_counts (guide_slug, total_views) VALUES (?, ?)
+            ON CONFLICT(guide_slug) DO UPDATE SET total_views = total_views + excluded.total_views
+        ''', list(views_by_guide.items()))
+        cursor.execute('UPDATE view_totals SET total_views = total_views + ? WHERE id = 1', (len(views),))
+
+        for table, column, bucket_format in (("guide_views_hourly", "hour", "%Y-%m-%d %H"),
+                                             ("guide_views_daily", "day", "%Y-%m-%d")):
+            buckets = Counter((view[0], view[4].strftime(bucket_format)) for view in views)
+            cursor.executemany(f'''
+                INSERT INTO {table} (guide_slug, {column}, views) VALUES (?, ?, ?)
+                ON CONFLICT({column}, guide_slug) DO UPDATE SET views = views + excluded.views
+            ''', [(guide_slug, bucket, count) for (guide_slug, bucket), count in buckets.items()])
+
+        if self.approximate_uniques:
+            self.update_sketches(cursor, [
+                (guide_slug, client_id, viewed_at.date().isoformat())
+                for guide_slug, client_id, _, _, viewed_at in views])
+            return None
+
+        cursor.executemany('''
+            INSERT INTO guide_views (guide_slug, client_id, ip_address, user_agent, viewed_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', views)
+        # trg_guide_viewers_counts counts the clients inserted here
+        cursor.executemany('''
+            INSERT OR IGNORE INTO guide_viewers (guide_slug, client_id) VALUES (?, ?)
+        ''', [(guide_slug, client_id) for guide_slug, client_id, _, _, _ in views])
+        return cursor.rowcount
+
+    def get_sketch(self, cursor: sqlite3.Cursor, guide_slug: Optional[str] = None,
+                   start_day: Optional[str] = None, end_day: Optional[str] = None) -> HyperLogLog:
+        """Merged sketch of a guide's (or all guides') viewers, over all time or a range of days"""
+        guide_key = guide_slug if guide_slug is not None else ALL_SKETCH_KEY
+        if start_day is None and end_day is None:
+            cursor.execute('SELECT sketch FROM view_sketches WHERE guide_slug = ? AND day = ?',
+                           (guide_key, ALL_SKETCH_KEY))
+        else:
+            # ALL_SKETCH_KEY sorts before any date, so it is never in range
+            cursor.execute('''
+                SELECT sketch FROM view_sketches
+                WHERE guide_slug = ? AND day BETWEEN ? AND ?
+            ''', (guide_key, start_day or "0000-00-00", end_day or "9999-12-31"))
+
+        sketches = [HyperLogLog.from_bytes(data) for (data,) in cursor.fetchall()]
+        # Sketches kept at a lower precision bring the merge down to theirs
+        precision = min([sketch.precision for sketch in sketches] + [self.hll_precision])
+        merged = HyperLogLog(precision)
+        for sketch in sketches:
+            merged.merge(sketch.fold(precision) if sketch.precision != precision else sketch)
+        return merged
+
+    def get_unique_viewers(self, guide_slug: Optional[str] = None,
+                           start_day: Optional[str] = None, end_day: Optional[str] = None) -> Dict[str, any]:
+        """
+        Count unique viewers of a guide (or all guides) between two YYYY-MM-DD days
+        Estimated from sketches in "hll" mode, with their standard relative error.
+        Day ranges only cover views that prune_views hasn't deleted yet
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                if self.approximate_uniques:
+                    sketch = self.get_sketch(cursor, guide_slug, start_day, end_day)
+                    return {
+                        "unique_viewers": sketch.count(),
+                        "approximate": True,
+                        "relative_error": round(sketch.relative_error, 4)
+                    }
+
+                if start_day is None and end_day is None:
+                    # All-time counts include viewers whose views were pruned
+                    if guide_slug is None:
+                        cursor.execute('SELECT COUNT(*) FROM view_clients')
+                    else:
+                        cursor.execute('SELECT COUNT(*) FROM guide_viewers WHERE guide_slug = ?',
+                                       (guide_slug,))
+                else:
+                    cursor.execute('''
+                        SELECT COUNT(DISTINCT client_id) FROM guide_views
+                        WHERE (? IS NULL OR guide_slug = ?)
+                        AND substr(viewed_at, 1, 10) BETWEEN ? AND ?
+                    ''', (guide_slug, guide_slug, start_day or "0000-00-00", end_day or "9999-12-31"))
+                return {
+                    "unique_viewers": cursor.fetchone()[0],
+                    "approximate": False,
+                    "relative_error": 0.0
+                }
+
+        except Exception as e:
+            print(f"❌ Error counting unique viewers: {e}")
+            return {"unique_viewers": 0, "approximate": self.approximate_uniques, "relative_error": 0.0}
+
     def track_view(self, guide_slug: str, client_id: str, ip_address: str, user_agent: str, excluded_ips: List[str] = None) -> bool:
         """
         Track a view for a guide
@@ -57,24 +639,11 @@ class ViewTracker:
             return False
 
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.get_connection() as conn:
                 cursor = conn.cursor()
-
-                # Use INSERT OR IGNORE to handle unique constraint
-                cursor.execute('''
-                    INSERT OR IGNORE INTO guide_views 
-                    (guide_slug, client_id, ip_address, user_agent, viewed_at)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (guide_slug, client_id, ip_address, user_agent, datetime.now()))
-
-                # Check if a new row was inserted
-                if cursor.rowcount > 0:
-                    print(
-                        f"📊 Tracked new view for guide: {guide_slug} from IP: {ip_address}")
-                else:
-                    print(
-                        f"📊 Skipped duplicate view for guide: {guide_slug} from IP: {ip_address}")
-
+                self.record_views(
+                    cursor, [(guide_slug, client_id, ip_address, user_agent, datetime.now())])
+                print(f"📊 Tracked view for guide: {guide_slug} from IP: {ip_address}")
                 conn.commit()
                 return True
 
@@ -82,25 +651,136 @@ class ViewTracker:
             print(f"❌ Error tracking view: {e}")
             return False
 
+    def start_writer(self, batch_size: int = 500, flush_interval: float = 1.0, max_queued: int = 10000):
+        """
+        Start writing views in the background
+        Views passed to enqueue_view are written in batches of up to batch_size,
+        at most flush_interval seconds after the first view of a batch arrived
+        """
+        if self.writer_thread is not None:
+            return
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.view_queue = queue.Queue(maxsize=max_queued)
+        self.writer_thread = threading.Thread(target=self.run_writer, name="view-writer", daemon=True)
+        self.writer_thread.start()
+
+    def stop_writer(self):
+        """Write every queued view and stop the writer"""
+        if self.writer_thread is None:
+            return
+        # The sentinel may wait behind a full queue, which the writer is draining
+        self.view_queue.put(None)
+        self.writer_thread.join()
+        self.writer_thread = None
+        self.view_queue = None
+
+    def flush(self):
+        """Block until every view queued so far has been written"""
+        if self.view_queue is not None:
+            self.view_queue.join()
+
+    def enqueue_view(self, guide_slug: str, client_id: str, ip_address: str, user_agent: str, excluded_ips: List[str] = None) -> bool:
+        """
+        Queue a view for the background writer
+        Returns False if the IP was excluded or the queue was full and the view was dropped
+        Writes synchronously if the writer isn't running
+        """
+        if self.writer_thread is None:
+            return self.track_view(guide_slug, client_id, ip_address, user_agent, excluded_ips)
+
+        if excluded_ips and ip_address in excluded_ips:
+            print(f"📊 Skipping view tracking for excluded IP: {ip_address}")
+            return False
+
+        try:
+            self.view_queue.put_nowait(
+                (guide_slug, client_id, ip_address, user_agent, datetime.now()))
+            return True
+        except queue.Full:
+            # Shed views rather than slowing down page requests
+            with self.ingestion_lock:
+                self.ingestion_stats["dropped"] += 1
+            return False
+
+    def run_writer(self):
+        """Writer thread: collect queued views into batches and write each in one transaction"""
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = None
+            while len(batch) < self.batch_size:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    view = self.view_queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if view is None:
+                    self.view_queue.task_done()
+                    stopping = True
+                    break
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(view)
+
+            if stopping:
+                # Views queued by requests that raced the shutdown
+                while True:
+                    try:
+                        view = self.view_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if view is None:
+                        self.view_queue.task_done()
+                    else:
+                        batch.append(view)
+
+            for start in range(0, len(batch), self.batch_size):
+                self.write_views(batch[start:start + self.batch_size])
+            # Written (or given up on), so flush() can return
+            for _ in batch:
+                self.view_queue.task_done()
+
+    def write_views(self, views: List[tuple]):
+        """Insert a batch of views in a single transaction"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                first_views = self.record_views(cursor, views)
+            with self.ingestion_lock:
+                self.ingestion_stats["written"] += len(views)
+                # Repeat views of a guide by the same client, only known in "exact" mode
+                if first_views is not None:
+                    self.ingestion_stats["duplicates"] += len(views) - first_views
+                self.ingestion_stats["batches"] += 1
+            if first_views is None:
+                print(f"📊 Wrote {len(views)} views")
+            else:
+                print(f"📊 Wrote {len(views)} views ({first_views} new viewers)")
+        except Exception as e:
+            with self.ingestion_lock:
+                self.ingestion_stats["failed"] += len(views)
+            print(f"❌ Error writing views: {e}")
+
+    def get_ingestion_stats(self) -> Dict[str, int]:
+        """Counters of the background view writer"""
+        with self.ingestion_lock:
+            stats = dict(self.ingestion_stats)
+        stats["queued"] = self.view_queue.qsize() if self.view_queue is not None else 0
+        return stats
+
     def get_guide_stats(self, guide_slug: str) -> Dict[str, int]:
         """Get view statistics for a guide"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.get_connection() as conn:
                 cursor = conn.cursor()
 
-                # Get total views
                 cursor.execute('''
-                    SELECT COUNT(*) FROM guide_views 
+                    SELECT total_views, unique_viewers FROM guide_view_counts 
                     WHERE guide_slug = ?
                 ''', (guide_slug,))
-                total_views = cursor.fetchone()[0]
-
-                # Get unique viewers
-                cursor.execute('''
-                    SELECT COUNT(DISTINCT client_id) FROM guide_views 
-                    WHERE guide_slug = ?
-                ''', (guide_slug,))
-                unique_viewers = cursor.fetchone()[0]
+                row = cursor.fetchone()
+                total_views, unique_viewers = row if row else (0, 0)
 
                 return {
                     "total_views": total_views,
@@ -111,24 +791,68 @@ class ViewTracker:
             print(f"❌ Error getting guide stats: {e}")
             return {"total_views": 0, "unique_viewers": 0}
 
+    def get_stats_bulk(self, guide_slugs: List[str]) -> Dict[str, Dict[str, int]]:
+        """Get view statistics for many guides in one query, keyed by slug"""
+        stats = {guide_slug: {"total_views": 0, "unique_viewers": 0} for guide_slug in guide_slugs}
+        if not stats:
+            return stats
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+
+                # Slugs are passed as one JSON array, so any number fits in a single query
+                cursor.execute('''
+                    SELECT guide_slug, total_views, unique_viewers FROM guide_view_counts
+                    WHERE guide_slug IN (SELECT value FROM json_each(?))
+                ''', (json.dumps(list(stats)),))
+                for guide_slug, total_views, unique_viewers in cursor.fetchall():
+                    stats[guide_slug] = {
+                        "total_views": total_views,
+                        "unique_viewers": unique_viewers
+                    }
+                return stats
+
+        except Exception as e:
+            print(f"❌ Error getting guide stats: {e}")
+            return stats
+
+    def get_view_version(self, guide_slug: Optional[str] = None) -> str:
+        """
+        Counter generation and number of views counted, for one guide or across all guides
+        Changes whenever the stats do, including when the counters are rebuilt
+        (e.g. after switching unique viewer modes), so it can version cached stats
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT value FROM view_meta WHERE key = 'counter_generation'")
+                row = cursor.fetchone()
+                generation = row[0] if row else "0"
+                if guide_slug is None:
+                    cursor.execute('SELECT total_views FROM view_totals WHERE id = 1')
+                else:
+                    cursor.execute(
+                        'SELECT total_views FROM guide_view_counts WHERE guide_slug = ?', (guide_slug,))
+                row = cursor.fetchone()
+                return f"{generation}.{row[0] if row else 0}"
+
+        except Exception as e:
+            print(f"❌ Error getting view version: {e}")
+            return "0.0"
+
     def get_overall_stats(self) -> Dict[str, int]:
         """Get overall statistics across all guides"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.get_connection() as conn:
                 cursor = conn.cursor()
 
-                # Total views across all guides
-                cursor.execute('SELECT COUNT(*) FROM guide_views')
-                total_views = cursor.fetchone()[0]
-
-                # Total unique viewers across all guides
+                # Total views and unique viewers across all guides
                 cursor.execute(
-                    'SELECT COUNT(DISTINCT client_id) FROM guide_views')
-                total_unique_viewers = cursor.fetchone()[0]
+                    'SELECT total_views, unique_viewers FROM view_totals WHERE id = 1')
+                total_views, total_unique_viewers = cursor.fetchone()
 
                 # Total guides with views
-                cursor.execute(
-                    'SELECT COUNT(DISTINCT guide_slug) FROM guide_views')
+                cursor.execute('SELECT COUNT(*) FROM guide_view_counts')
                 total_guides = cursor.fetchone()[0]
 
                 return {
@@ -144,16 +868,12 @@ class ViewTracker:
     def get_top_guides(self, limit: int = 3) -> List[Dict[str, any]]:
         """Get top guides by unique viewers"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.get_connection() as conn:
                 cursor = conn.cursor()
 
                 cursor.execute('''
-                    SELECT 
-                        guide_slug,
-                        COUNT(*) as total_views,
-                        COUNT(DISTINCT client_id) as unique_viewers
-                    FROM guide_views 
-                    GROUP BY guide_slug 
+                    SELECT guide_slug, total_views, unique_viewers
+                    FROM guide_view_counts 
                     ORDER BY unique_viewers DESC, total_views DESC
                     LIMIT ?
                 ''', (limit,))
@@ -184,23 +904,21 @@ class ViewTracker:
 
             migrated_count = 0
             for guide_slug, stats in data.items():
-                # For each unique viewer, create a view record
-                for client_id in stats.get("unique_viewers", []):
-                    try:
-                        with sqlite3.connect(self.db_path) as conn:
-                            cursor = conn.cursor()
-                            cursor.execute('''
-                                INSERT OR IGNORE INTO guide_views 
-                                (guide_slug, client_id, ip_address, user_agent, viewed_at)
-                                VALUES (?, ?, ?, ?, ?)
-                            ''', (guide_slug, client_id, "migrated", "migrated", datetime.now()))
-
-                            if cursor.rowcount > 0:
-                                migrated_count += 1
-
-                            conn.commit()
-                    except Exception as e:
-                        print(f"❌ Error migrating data for {guide_slug}: {e}")
+                try:
+                    with self.get_connection() as conn:
+                        cursor = conn.cursor()
+                        # Record a view for each unique viewer not migrated already
+                        cursor.execute('SELECT client_id FROM guide_viewers WHERE guide_slug = ?', (guide_slug,))
+                        known = {client_id for (client_id,) in cursor.fetchall()}
+                        views = [(guide_slug, client_id, "migrated", "migrated", datetime.now())
+                                 for client_id in dict.fromkeys(stats.get("unique_viewers", []))
+                                 if client_id not in known]
+                        if views:
+                            self.record_views(cursor, views)
+                        migrated_count += len(views)
+                        conn.commit()
+                except Exception as e:
+                    print(f"❌ Error migrating data for {guide_slug}: {e}")
 
             print(f"✅ Migrated {migrated_count} view records from JSON")
 
@@ -210,10 +928,10 @@ class ViewTracker:
     def get_guide_list(self) -> List[str]:
         """Get list of all guides that have been viewed"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
-                    'SELECT DISTINCT guide_slug FROM guide_views ORDER BY guide_slug')
+                    'SELECT guide_slug FROM guide_view_counts ORDER BY guide_slug')
                 return [row[0] for row in cursor.fetchall()]
         except Exception as e:
             print(f"❌ Error getting guide list: {e}")
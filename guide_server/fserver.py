@@ -1,21 +1,44 @@
 import os
 import secrets
+import asyncio
 from datetime import datetime, timedelta
 from fastapi import FastAPI, Response, Request, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+from markupsafe import Markup, escape
 from pathlib import Path
 import json
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from slugify import slugify
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
-from collections import defaultdict
+from typing import Dict, Any, Optional, Callable
+from collections import defaultdict, OrderedDict
 import hashlib
+import threading
+import gzip
+import time
+import multiprocessing
+import functools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from database import ViewTracker
+from highlighter import SnippetHighlighter
+from search import SearchIndex
 from contextlib import asynccontextmanager
+from email.utils import formatdate, parsedate_to_datetime
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from watchfiles import awatch, Change
+except ImportError:
+    awatch = None
 
 # Load environment variables from .env file
 load_dotenv(f"{os.path.dirname(os.path.abspath(__file__))}/.env")
@@ -31,18 +54,46 @@ async def lifespan(app: FastAPI):
     print(f"   Dev mode: {DEV_MODE}")
 
     # Initialize SQLite database
+    view_tracker.initialize()
     print(f"   Database initialized: {view_tracker.db_path}")
+    view_tracker.start_writer(VIEW_BATCH_SIZE, VIEW_FLUSH_INTERVAL, VIEW_QUEUE_MAX)
+    retention_task = asyncio.create_task(run_view_retention()) if VIEW_RETENTION_DAYS > 0 else None
 
     # Clean up expired sessions
     cleanup_expired_sessions()
 
-    # Generate all guides
-    generate_all_guides()
+    # Measure how late the event loop runs scheduled callbacks
+    lag_task = asyncio.create_task(monitor_event_loop_lag())
+
+    # Generate guides in the background; the last good artifacts are served meanwhile
+    warmup_task = asyncio.create_task(warm_up())
+
+    # Rebuild guides queued by admin edits without blocking request handlers
+    rebuild_task = start_rebuild_worker()
+
+    # Pick up guide and template edits made outside the admin API
+    watcher_stop = asyncio.Event()
+    watcher_task = start_guide_watcher(watcher_stop) if GUIDE_WATCHER else None
 
     yield
 
     # Shutdown (if needed)
     print("🛑 Shutting down guide server...")
+    warmup_task.cancel()
+    lag_task.cancel()
+    # Guides still queued are rebuilt by the next startup's warm-up
+    rebuild_task.cancel()
+    for timer in list(rebuild_timers):
+        timer.cancel()
+    if retention_task:
+        retention_task.cancel()
+    # Write out queued views before closing the database
+    await asyncio.to_thread(view_tracker.stop_writer)
+    view_tracker.close()
+    if watcher_task:
+        # Let watchfiles shut its watcher thread down instead of cancelling it
+        watcher_stop.set()
+        await watcher_task
 
 app = FastAPI(lifespan=lifespan)
 
@@ -65,6 +116,20 @@ BASE_DIR = Path(__file__).resolve().parent
 TEMPLATES_DIR = BASE_DIR / "templates"
 GUIDES_DIR = BASE_DIR / "guides"
 STATIC_DIR = BASE_DIR / "static"
+# Compiled template bytecode, reused across restarts
+JINJA_CACHE_DIR = BASE_DIR / ".jinja_cache"
+# Highlighted code snippets, addressed by a hash of (language, snippet)
+HIGHLIGHT_CACHE_DIR = BASE_DIR / ".highlight_cache"
+# Input hashes of the last successful build of each guide
+BUILD_MANIFEST_FILE = BASE_DIR / "build_manifest.json"
+# Full-text search index, one segment file per guide
+SEARCH_INDEX_DIR = BASE_DIR / ".search_index"
+# Every template file a tutorial page is rendered from
+TUTORIAL_TEMPLATE_FILES = [
+    TEMPLATES_DIR / "tabbed_tutorial.html",
+    TEMPLATES_DIR / "partials" / "tutorial_phase.html",
+    TEMPLATES_DIR / "partials" / "tutorial_step.html",
+]
 
 print("Templates directory:", TEMPLATES_DIR)
 print("Static directory:", STATIC_DIR)
@@ -74,6 +139,68 @@ DEV_MODE = os.getenv("DEV_MODE", "false").lower() == "true"
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", "8002"))
 
+# Highlight code snippets when guides are built instead of in the browser
+SERVER_SIDE_HIGHLIGHTING = os.getenv(
+    "SERVER_SIDE_HIGHLIGHTING", "true").lower() == "true"
+
+# Worker processes for parallel guide builds, and the number of guides
+# that need rebuilding before a build is spread across them
+GUIDE_BUILD_WORKERS = int(
+    os.getenv("GUIDE_BUILD_WORKERS", str(os.cpu_count() or 1)))
+PARALLEL_BUILD_MIN_GUIDES = int(os.getenv("PARALLEL_BUILD_MIN_GUIDES", "50"))
+
+# Seconds a queued guide rebuild waits for further edits before it runs
+REBUILD_DEBOUNCE_SECONDS = float(os.getenv("REBUILD_DEBOUNCE_SECONDS", "1.0"))
+# Number of finished rebuild jobs kept for the job status API
+REBUILD_JOB_HISTORY = int(os.getenv("REBUILD_JOB_HISTORY", "200"))
+
+# Views are written to SQLite in the background, in batches of up to
+# VIEW_BATCH_SIZE at most VIEW_FLUSH_INTERVAL seconds after they arrive.
+# Views beyond VIEW_QUEUE_MAX waiting to be written are dropped.
+VIEW_BATCH_SIZE = int(os.getenv("VIEW_BATCH_SIZE", "500"))
+VIEW_FLUSH_INTERVAL = float(os.getenv("VIEW_FLUSH_INTERVAL", "1.0"))
+VIEW_QUEUE_MAX = int(os.getenv("VIEW_QUEUE_MAX", "10000"))
+
+# How unique viewers are counted; total views count every view in both modes.
+# "exact" stores each view and (guide, client) pair and counts unique viewers
+# exactly. "hll" stores no client ids and estimates unique viewers with
+# fixed-size HyperLogLog sketches per guide and day (about 1.6% error at the
+# default HLL_PRECISION of 12, which uses 4 KB per sketch). HLL_PRECISION can
+# be lowered later, not raised.
+VIEW_UNIQUE_MODE = os.getenv("VIEW_UNIQUE_MODE", "exact").lower()
+HLL_PRECISION = int(os.getenv("HLL_PRECISION", "12"))
+
+# Raw views, hourly view counts and per-day unique viewer sketches older than
+# this many days are deleted (0 keeps everything). Daily counts and all-time
+# totals are kept. In exact mode the (guide, client) pairs that stop a client
+# from being counted twice are kept too, so storage still grows with the
+# number of unique viewers.
+VIEW_RETENTION_DAYS = int(os.getenv("VIEW_RETENTION_DAYS", "0"))
+# Seconds between view retention runs
+VIEW_RETENTION_INTERVAL = 3600
+
+# Threads for blocking file and database work done by admin requests
+IO_WORKERS = int(os.getenv("IO_WORKERS", "4"))
+
+# Watch guide and template files and rebuild affected guides when they change
+GUIDE_WATCHER = os.getenv("GUIDE_WATCHER", "false").lower() == "true"
+
+# Maximum number of rendered tutorial pages kept in memory
+RENDER_CACHE_MAX_ENTRIES = int(os.getenv("RENDER_CACHE_MAX_ENTRIES", "32"))
+# Maximum number of rendered phase/step fragments kept in memory
+FRAGMENT_CACHE_MAX_ENTRIES = int(
+    os.getenv("FRAGMENT_CACHE_MAX_ENTRIES", "4096"))
+
+# How public tutorial pages are served: "prebuilt" sends the tutorial.html
+# written by the guide build when it is up to date, "render" always renders,
+# "stream" always renders and sends the page while the template is rendering
+TUTORIAL_SERVE_MODE = os.getenv("TUTORIAL_SERVE_MODE", "prebuilt").lower()
+# Bytes of rendered output collected before each streamed chunk is sent
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "8192"))
+# Streamed pages up to this many bytes are kept for the render cache; larger
+# pages aren't buffered, so streaming them never holds a whole page in memory
+STREAM_CACHE_MAX_BYTES = int(os.getenv("STREAM_CACHE_MAX_BYTES", "1048576"))
+
 # IP exclusion for view tracking
 EXCLUDED_IPS = os.getenv("EXCLUDED_IPS", "").split(
     ",") if os.getenv("EXCLUDED_IPS") else []
@@ -159,7 +286,13 @@ class GuideData(BaseModel):
 active_sessions = {}
 
 # Initialize SQLite view tracker
-view_tracker = ViewTracker(BASE_DIR / "view_stats.db")
+view_tracker = ViewTracker(BASE_DIR / "view_stats.db",
+                           unique_mode=VIEW_UNIQUE_MODE, hll_precision=HLL_PRECISION)
+# Server-side code highlighter shared by every guide build
+snippet_highlighter = SnippetHighlighter(
+    HIGHLIGHT_CACHE_DIR, enabled=SERVER_SIDE_HIGHLIGHTING)
+# Search over published guide content, updated as guides are rebuilt
+search_index = SearchIndex(SEARCH_INDEX_DIR)
 # Set this in production
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD")
 if not ADMIN_PASSWORD:
@@ -228,8 +361,15 @@ def track_guide_view(guide_slug: str, request: Request):
     user_agent = request.headers.get("user-agent", "")
     client_id = get_client_id(request)
 
-    # Track view with IP exclusion
-    return view_tracker.track_view(guide_slug, client_id, client_ip, user_agent, EXCLUDED_IPS)
+    # Track view with IP exclusion; written to the database in the background
+    return view_tracker.enqueue_view(guide_slug, client_id, client_ip, user_agent, EXCLUDED_IPS)
+
+
+async def run_view_retention():
+    """Prune raw views past VIEW_RETENTION_DAYS at startup and then periodically"""
+    while True:
+        await asyncio.to_thread(view_tracker.prune_views, VIEW_RETENTION_DAYS)
+        await asyncio.sleep(VIEW_RETENTION_INTERVAL)
 
 
 def get_guide_stats(guide_slug: str) -> Dict[str, int]:
@@ -318,9 +458,70 @@ async def get_current_user_flexible(request: Request) -> bool:
     )
 
 
+# Shared Jinja environment, created on first use
+jinja_env = None
+jinja_env_lock = threading.Lock()
+
+
+class SourceHashingLoader(FileSystemLoader):
+    """FileSystemLoader that remembers the hash of each template source it loads"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.source_hashes = {}
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        self.source_hashes[template] = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        return source, filename, uptodate
+
+
 def get_jinja_env():
-    """Get Jinja environment, reloading templates in dev mode"""
-    return Environment(loader=FileSystemLoader(str(TEMPLATES_DIR)))
+    """Get the shared Jinja environment, reloading changed templates in dev mode"""
+    global jinja_env
+    if jinja_env is None:
+        with jinja_env_lock:
+            if jinja_env is None:
+                JINJA_CACHE_DIR.mkdir(exist_ok=True)
+                jinja_env = Environment(
+                    loader=SourceHashingLoader(str(TEMPLATES_DIR)),
+                    bytecode_cache=FileSystemBytecodeCache(
+                        str(JINJA_CACHE_DIR)),
+                    auto_reload=DEV_MODE,
+                )
+                jinja_env.filters["highlight_code"] = highlight_code
+                jinja_env.globals["server_highlighting"] = snippet_highlighter.enabled
+                jinja_env.globals["render_phase_fragment"] = render_phase_fragment
+    return jinja_env
+
+
+def highlight_code(code: str, language: str) -> Markup:
+    """Jinja filter returning highlighted snippet HTML, or the escaped snippet"""
+    highlighted = snippet_highlighter.highlight(code, language)
+    if highlighted is None:
+        return escape(code)
+    return Markup(highlighted)
+
+
+def reload_templates():
+    """Drop compiled templates so the next render loads them from disk again"""
+    # Bytecode is keyed by template source checksum, so only the
+    # in-memory template cache can go stale
+    get_jinja_env().cache.clear()
+    invalidate_rendered_pages()
+    invalidate_fragments()
+    print("🔄 Templates reloaded")
+
+
+def get_compiled_template_hash(template_name: str) -> str:
+    """Hash of the template source the shared environment renders template_name from
+
+    Without auto_reload this is the source compiled before the last
+    reload_templates(), which may differ from the file on disk.
+    """
+    env = get_jinja_env()
+    env.get_template(template_name)
+    return env.loader.source_hashes[template_name]
 
 
 def get_templates():
@@ -331,6 +532,351 @@ def get_templates():
     }
 
 
+# Rendered tutorial pages: {guide_slug: (source_fingerprint, html_bytes)}
+rendered_page_cache = OrderedDict()
+rendered_page_cache_lock = threading.Lock()
+
+
+# Rendered tutorial phases and steps: {content_key: Markup}
+fragment_cache = OrderedDict()
+fragment_cache_lock = threading.Lock()
+
+PHASE_FRAGMENT_TEMPLATE = "partials/tutorial_phase.html"
+STEP_FRAGMENT_TEMPLATE = "partials/tutorial_step.html"
+
+
+def get_fragment_key(template_name: str, *content) -> str:
+    """Hash a fragment's content together with the template that renders it"""
+    template_fingerprint = get_source_fingerprint(TEMPLATES_DIR / template_name)
+    key_source = json.dumps([template_name, template_fingerprint, *content],
+                            sort_keys=True, default=str)
+    return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+
+def get_cached_fragment(key: str, render) -> Markup:
+    """Return a cached fragment, rendering and caching it on a miss"""
+    with fragment_cache_lock:
+        fragment = fragment_cache.get(key)
+        if fragment is not None:
+            fragment_cache.move_to_end(key)
+            return fragment
+
+    fragment = Markup(render())
+    with fragment_cache_lock:
+        fragment_cache[key] = fragment
+        while len(fragment_cache) > FRAGMENT_CACHE_MAX_ENTRIES:
+            fragment_cache.popitem(last=False)
+    return fragment
+
+
+def invalidate_fragments():
+    """Drop every cached phase and step fragment"""
+    with fragment_cache_lock:
+        fragment_cache.clear()
+
+
+def render_phase_fragment(phase: Dict[str, Any]) -> Markup:
+    """Render a tutorial phase from cached step fragments, re-rendering only changed steps"""
+    steps = phase.get("steps", [])
+    step_keys = [get_fragment_key(STEP_FRAGMENT_TEMPLATE, phase.get("phase"), step_index, step)
+                 for step_index, step in enumerate(steps, start=1)]
+    phase_key = get_fragment_key(PHASE_FRAGMENT_TEMPLATE, phase.get("phase"),
+                                 phase.get("title"), step_keys)
+
+    def render_phase():
+        env = get_jinja_env()
+        step_template = env.get_template(STEP_FRAGMENT_TEMPLATE)
+        steps_html = "".join(
+            get_cached_fragment(step_key, lambda: step_template.render(
+                phase=phase, step=step, step_index=step_index))
+            for step_index, (step, step_key) in enumerate(zip(steps, step_keys), start=1))
+        return env.get_template(PHASE_FRAGMENT_TEMPLATE).render(
+            phase=phase, steps_html=Markup(steps_html))
+
+    return get_cached_fragment(phase_key, render_phase)
+
+
+def get_source_fingerprint(*paths: Path) -> tuple:
+    """Return an (mtime, size) pair per path, or None for files that don't exist"""
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = path.stat()
+            fingerprint.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            fingerprint.append(None)
+    return tuple(fingerprint)
+
+
+def get_cached_page(guide_slug: str, fingerprint: tuple) -> Optional[bytes]:
+    """Return the cached page for a guide if it was rendered from the same sources"""
+    with rendered_page_cache_lock:
+        entry = rendered_page_cache.get(guide_slug)
+        if entry is None or entry[0] != fingerprint:
+            return None
+        rendered_page_cache.move_to_end(guide_slug)
+        return entry[1]
+
+
+def store_cached_page(guide_slug: str, fingerprint: tuple, content: bytes):
+    """Cache a rendered page, evicting the least recently used pages"""
+    with rendered_page_cache_lock:
+        rendered_page_cache[guide_slug] = (fingerprint, content)
+        rendered_page_cache.move_to_end(guide_slug)
+        while len(rendered_page_cache) > RENDER_CACHE_MAX_ENTRIES:
+            rendered_page_cache.popitem(last=False)
+
+
+def invalidate_rendered_pages(guide_slug: Optional[str] = None):
+    """Drop the cached page for a guide, or every cached page if no slug is given"""
+    with rendered_page_cache_lock:
+        if guide_slug is None:
+            rendered_page_cache.clear()
+        else:
+            rendered_page_cache.pop(guide_slug, None)
+
+
+# Content hashes of files on disk: {path: (source_fingerprint, sha256_hex)}
+file_hash_cache = {}
+file_hash_cache_lock = threading.Lock()
+
+
+def get_file_hash(path: Path) -> Optional[str]:
+    """Return the sha256 of a file, only re-reading it when its mtime or size changes"""
+    fingerprint = get_source_fingerprint(path)
+    if fingerprint[0] is None:
+        return None
+
+    key = str(path)
+    with file_hash_cache_lock:
+        entry = file_hash_cache.get(key)
+        if entry is not None and entry[0] == fingerprint:
+            return entry[1]
+
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    with file_hash_cache_lock:
+        file_hash_cache[key] = (fingerprint, digest)
+    return digest
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[float] = None) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since against a representation"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # If-None-Match uses weak comparison
+        candidates = [tag.strip().removeprefix("W/")
+                      for tag in if_none_match.split(",")]
+        return etag.removeprefix("W/") in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+
+    return False
+
+
+def conditional_json_response(request: Request, etag: str, get_content: Callable[[], Any],
+                              last_modified: Optional[float] = None) -> Response:
+    """Send JSON that clients revalidate, or a 304 if their copy is current
+
+    get_content is only called when the content has to be sent.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=get_content(), headers=headers)
+
+
+# Precompressed page variants written by the guide build, in order of preference
+PRECOMPRESSED_ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+def get_accepted_encodings(request: Request) -> Dict[str, float]:
+    """Parse Accept-Encoding into {coding: qvalue}"""
+    accepted = {}
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        qvalue = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                qvalue = float(params[2:])
+            except ValueError:
+                qvalue = 0.0
+        accepted[coding.strip().lower()] = qvalue
+    return accepted
+
+
+def select_page_variant(request: Request, page_file: Path) -> tuple[Optional[str], Path]:
+    """Pick the precompressed variant of a page the client accepts, if one is up to date"""
+    accepted = get_accepted_encodings(request)
+    page_mtime = page_file.stat().st_mtime_ns
+    for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0.0)) <= 0:
+            continue
+        variant_file = page_file.with_name(page_file.name + suffix)
+        variant_fingerprint = get_source_fingerprint(variant_file)[0]
+        if variant_fingerprint is not None and variant_fingerprint[0] >= page_mtime:
+            return encoding, variant_file
+    return None, page_file
+
+
+def serve_prebuilt_page(request: Request, page_file: Path) -> Response:
+    """Send a generated HTML file with a strong ETag, answering revalidations with 304"""
+    encoding, variant_file = select_page_variant(request, page_file)
+    stat_result = variant_file.stat()
+    headers = {
+        # Each encoding is a separate representation, so it gets its own ETag
+        "ETag": f'"{get_file_hash(variant_file)}"',
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        # Let browsers and proxies keep the page but revalidate it on every use
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    if is_not_modified(request, headers["ETag"], stat_result.st_mtime):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(variant_file, media_type="text/html", headers=headers, stat_result=stat_result)
+
+
+def stream_tutorial_page(guide_slug: str, template, context: Dict[str, Any], fingerprint: Optional[tuple] = None):
+    """Yield a page in chunks as the template renders, caching it once it is complete
+
+    Pages larger than STREAM_CACHE_MAX_BYTES are streamed without being cached.
+    """
+    # None once the page has outgrown the cache limit
+    rendered_chunks = [] if fingerprint is not None else None
+    rendered_size = 0
+    pending = []
+    pending_size = 0
+    for piece in template.generate(**context):
+        data = piece.encode("utf-8")
+        pending.append(data)
+        pending_size += len(data)
+        if pending_size >= STREAM_CHUNK_SIZE:
+            chunk = b"".join(pending)
+            pending, pending_size = [], 0
+            rendered_chunks, rendered_size = keep_streamed_chunk(rendered_chunks, rendered_size, chunk)
+            yield chunk
+
+    if pending:
+        chunk = b"".join(pending)
+        rendered_chunks, rendered_size = keep_streamed_chunk(rendered_chunks, rendered_size, chunk)
+        yield chunk
+
+    if rendered_chunks is not None:
+        store_cached_page(guide_slug, fingerprint, b"".join(rendered_chunks))
+
+
+def keep_streamed_chunk(rendered_chunks: Optional[list], rendered_size: int, chunk: bytes) -> tuple:
+    """Add a streamed chunk to the copy kept for caching, dropping the copy past the size limit"""
+    if rendered_chunks is None:
+        return None, rendered_size
+    rendered_size += len(chunk)
+    if rendered_size > STREAM_CACHE_MAX_BYTES:
+        return None, rendered_size
+    rendered_chunks.append(chunk)
+    return rendered_chunks, rendered_size
+
+
+# Length of the content hash used to version guide data URLs
+DATA_VERSION_LENGTH = 16
+
+
+def get_guide_data_url(guide_slug: str, data_file: Path, endpoint: str) -> Optional[str]:
+    """Return a content-versioned URL for one of a guide's data files"""
+    file_hash = get_file_hash(data_file)
+    if file_hash is None:
+        return None
+    return f"/guides/{guide_slug}/{endpoint}?v={file_hash[:DATA_VERSION_LENGTH]}"
+
+
+def serve_guide_data_file(request: Request, data_file: Path, version: Optional[str]) -> Response:
+    """Send a guide data file; URLs carrying its current content hash are cacheable forever"""
+    if not data_file.exists():
+        raise HTTPException(status_code=404, detail="Guide data not found")
+
+    stat_result = data_file.stat()
+    file_hash = get_file_hash(data_file)
+    headers = {
+        "ETag": f'"{file_hash}"',
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+    }
+    if version == file_hash[:DATA_VERSION_LENGTH]:
+        headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        headers["Cache-Control"] = "no-cache"
+
+    if is_not_modified(request, headers["ETag"], stat_result.st_mtime):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(data_file, media_type="application/json", headers=headers, stat_result=stat_result)
+
+
+def get_tutorial_render_context(guide_slug: str, tutorial_json: Path, flow_json: Path, data_urls: bool = True) -> Dict[str, Any]:
+    """Load a guide's tutorial and flow files into the tutorial template context
+
+    With data_urls the page fetches the tutorial and flow data from versioned
+    data endpoints instead of embedding a second copy of it in the HTML.
+    """
+    with open(tutorial_json, encoding="utf-8") as f:
+        data = json.load(f)
+    tutorial = data.get("tutorial", {})
+    assets = data.get("assets", {}) or {}
+    # Handle nested assets structure
+    if 'assets' in assets:
+        assets = assets['assets']
+    css_links = "\n".join(
+        f"<link rel='stylesheet' href='{href}'>" for href in assets.get("css", []) or [])
+    js_links = "\n".join(
+        f"<script src='{src}' defer></script>" for src in assets.get("js", []) or [])
+    total_steps = sum(len(p["steps"]) for p in tutorial.get("phases", []))
+
+    # Load flow data if flow.json exists
+    flow_data = None
+    if flow_json.exists():
+        try:
+            with open(flow_json, encoding="utf-8") as f:
+                flow_data = json.load(f)
+            print(
+                f"✅ Loaded flow data for {guide_slug}: {len(flow_data.get('phases', []))} phases")
+        except Exception as e:
+            print(f"❌ Error loading flow data for {guide_slug}: {e}")
+    else:
+        print(f"⚠️ No flow.json found for {guide_slug}")
+
+    tutorial_data_url = None
+    flow_data_url = None
+    if data_urls:
+        tutorial_data_url = get_guide_data_url(
+            guide_slug, tutorial_json, "data.json")
+        if flow_data:
+            flow_data_url = get_guide_data_url(
+                guide_slug, flow_json, "flow.json")
+
+    return {
+        "title": tutorial.get("title", ""),
+        "description": tutorial.get("description", ""),
+        "css_links": css_links,
+        "js_links": js_links,
+        "tutorial_data": tutorial,
+        "total_steps": total_steps,
+        "flow_data": flow_data,
+        "tutorial_data_url": tutorial_data_url,
+        "flow_data_url": flow_data_url,
+    }
+
+
 def get_guides():
     """Return a dict of {guide_slug: guide_path}"""
     guides = {}
@@ -340,23 +886,193 @@ def get_guides():
     return guides
 
 
-def generate_guide(guide_slug: str, use_temp_files=False):
-    """Generate HTML for a specific guide"""
-    print(
-        f"🔧 generate_guide called for {guide_slug}, use_temp_files={use_temp_files}")
+# In-memory index of guide metadata: {guide_slug: entry}, loaded on first use
+guide_catalog = None
+guide_catalog_lock = threading.Lock()
+# Content hash of the catalog (None when it needs recomputing) and when it last changed
+guide_catalog_hash = None
+guide_catalog_updated_at = time.time()
+
+
+def read_guide_json(path: Path) -> Optional[Dict[str, Any]]:
+    """Load a guide JSON file, or None if it is missing or unreadable"""
+    if not path.exists():
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Warning: Could not read {path.name} for {path.parent.name}: {e}")
+        return None
+
+
+def count_steps(phases) -> int:
+    """Total number of steps across a list of phases"""
+    return sum(len(phase.get("steps") or []) for phase in phases or [])
+
+
+# Per-guide metadata sidecar, so the catalog can be loaded without parsing guide content
+GUIDE_META_FILE = "meta.json"
+# Bump when the sidecar format changes so old sidecars are rewritten
+GUIDE_META_VERSION = 1
+# Guide files a sidecar is derived from
+GUIDE_META_SOURCES = ["tutorial.json", "flow.json", "draft.json"]
+
+
+def get_guide_meta_sources(guide_path: Path) -> list:
+    """(mtime_ns, size) of each sidecar source file, in JSON form"""
+    return [list(fingerprint) if fingerprint else None
+            for fingerprint in get_source_fingerprint(*(guide_path / name for name in GUIDE_META_SOURCES))]
+
+
+def read_guide_meta(guide_slug: str) -> Optional[Dict[str, Any]]:
+    """Load a guide's sidecar, or None if it is missing or older than the guide's files"""
+    guide_path = GUIDES_DIR / guide_slug
+    meta = read_guide_json(guide_path / GUIDE_META_FILE)
+    if (meta is None or meta.get("version") != GUIDE_META_VERSION
+            or meta.get("sources") != get_guide_meta_sources(guide_path)):
+        return None
+    return meta
+
+
+def write_guide_meta(guide_slug: str, published: bool = False) -> Optional[Dict[str, Any]]:
+    """Read a guide's files and write its meta.json sidecar
+
+    Set published when the guide was just published to record published_at.
+    Returns the sidecar contents, or None if the guide is gone.
+    """
+    guide_path = GUIDES_DIR / guide_slug
+    if not guide_path.is_dir():
+        return None
+
+    tutorial_json = guide_path / "tutorial.json"
+    flow_json = guide_path / "flow.json"
+    draft_json = guide_path / "draft.json"
+    tutorial_html = guide_path / "tutorial.html"
+    # Fingerprint sources before reading them, so an edit made meanwhile is picked up next time
+    sources = get_guide_meta_sources(guide_path)
+    published_data = read_guide_json(tutorial_json)
+    flow_data = read_guide_json(flow_json)
+    draft_data = read_guide_json(draft_json)
+
+    # Prefer published data, fall back to the draft
+    tutorial_data = (published_data or draft_data or {}).get("tutorial") or {}
+    if flow_data is None and draft_data is not None:
+        flow_data = draft_data.get("flow")
+    flow_data = flow_data or {}
+
+    if published:
+        published_at = datetime.now().isoformat()
+    else:
+        previous_meta = read_guide_json(guide_path / GUIDE_META_FILE) or {}
+        published_at = previous_meta.get("published_at")
+        if published_at is None and tutorial_json.exists():
+            published_at = datetime.fromtimestamp(tutorial_json.stat().st_mtime).isoformat()
+
+    meta = {
+        "version": GUIDE_META_VERSION,
+        "slug": guide_slug,
+        "title": tutorial_data.get("title", guide_slug),
+        "description": tutorial_data.get("description", ""),
+        "has_tutorial": tutorial_json.exists(),
+        "has_published": tutorial_json.exists() or flow_json.exists(),
+        "has_draft": draft_json.exists(),
+        "phase_count": len(tutorial_data.get("phases") or []),
+        "step_count": count_steps(tutorial_data.get("phases")),
+        "flow_step_count": count_steps(flow_data.get("phases")),
+        "tutorial_hash": get_file_hash(tutorial_json),
+        "flow_hash": get_file_hash(flow_json),
+        "draft_hash": get_file_hash(draft_json),
+        "published_at": published_at,
+        "html_size": tutorial_html.stat().st_size if tutorial_html.exists() else None,
+        "sources": sources,
+    }
+    try:
+        write_file_atomic(guide_path / GUIDE_META_FILE,
+                          json.dumps(meta, indent=2, ensure_ascii=False).encode("utf-8"))
+    except OSError as e:
+        print(f"❌ Error writing {GUIDE_META_FILE} for {guide_slug}: {e}")
+    return meta
+
+
+def load_catalog_entry(guide_slug: str) -> Optional[Dict[str, Any]]:
+    """Catalog entry for a guide from its sidecar, rewriting the sidecar if it is stale"""
+    return read_guide_meta(guide_slug) or write_guide_meta(guide_slug)
+
+
+def get_guide_catalog() -> Dict[str, Dict[str, Any]]:
+    """Return the catalog sorted by slug, loading it from the guides' sidecars on first use
+
+    Entries are shared with the catalog and must not be modified.
+    """
+    global guide_catalog
+    if guide_catalog is None:
+        with guide_catalog_lock:
+            if guide_catalog is None:
+                entries = {}
+                for guide_slug in get_guides():
+                    entry = load_catalog_entry(guide_slug)
+                    if entry is not None:
+                        entries[guide_slug] = entry
+                guide_catalog = entries
+                print(f"📚 Loaded guide catalog: {len(entries)} guides")
+    with guide_catalog_lock:
+        return dict(sorted(guide_catalog.items()))
+
+
+def set_catalog_entry(guide_slug: str, entry: Optional[Dict[str, Any]]):
+    """Replace a guide's catalog entry, removing it when entry is None"""
+    if guide_catalog is None:
+        # Loaded from disk on first use
+        return
+    global guide_catalog_hash, guide_catalog_updated_at
+    with guide_catalog_lock:
+        if guide_catalog.get(guide_slug) == entry:
+            return
+        if entry is None:
+            guide_catalog.pop(guide_slug, None)
+        else:
+            guide_catalog[guide_slug] = entry
+        guide_catalog_hash = None
+        guide_catalog_updated_at = time.time()
+
+
+def get_catalog_version() -> tuple[str, float]:
+    """(content hash, last change time) of the catalog, for ETags on listings"""
+    global guide_catalog_hash
+    # Make sure the catalog is loaded
+    get_guide_catalog()
+    with guide_catalog_lock:
+        if guide_catalog_hash is None:
+            # Sidecar entries carry content hashes, so hashing the entries covers the guides' files
+            guide_catalog_hash = hashlib.sha256(
+                json.dumps(guide_catalog, sort_keys=True).encode("utf-8")).hexdigest()
+        return guide_catalog_hash, guide_catalog_updated_at
+
+
+def refresh_catalog_entry(guide_slug: str, published: bool = False):
+    """Rewrite a guide's sidecar and catalog entry after its files were written or removed"""
+    set_catalog_entry(guide_slug, write_guide_meta(guide_slug, published=published))
+
+
+def reload_catalog_entry(guide_slug: str):
+    """Pick up a sidecar written by a build, which may have run in another process"""
+    set_catalog_entry(guide_slug, load_catalog_entry(guide_slug))
+
+
+def generate_preview(guide_slug: str):
+    """Generate the preview HTML of a guide from its temporary draft files
+
+    Published pages are built by build_guide.
+    """
+    print(f"🔧 Generating preview for {guide_slug}")
     guide_dir = GUIDES_DIR / guide_slug
     if not guide_dir.exists():
         raise Exception(f"Guide directory {guide_slug} not found")
 
-    # Use temporary files for preview mode
-    if use_temp_files:
-        tutorial_file = guide_dir / "temp_tutorial.json"
-        flow_file = guide_dir / "temp_flow.json"
-        output_file = guide_dir / "temp_tutorial.html"
-    else:
-        tutorial_file = guide_dir / "tutorial.json"
-        flow_file = guide_dir / "flow.json"
-        output_file = guide_dir / "tutorial.html"
+    tutorial_file = guide_dir / "temp_tutorial.json"
+    flow_file = guide_dir / "temp_flow.json"
+    output_file = guide_dir / "temp_tutorial.html"
 
     if not tutorial_file.exists():
         raise Exception(f"Tutorial file not found for guide {guide_slug}")
@@ -396,79 +1112,565 @@ def generate_guide(guide_slug: str, use_temp_files=False):
         flow_data=flow_data,
         total_steps=total_steps,
         js_links=js_links,
-        is_preview=use_temp_files
+        is_preview=True
     )
 
-    # Write the generated HTML
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    # Previews are served uncompressed
+    write_page_artifacts(output_file, html_content, compress=False)
 
-    print(f"Generated HTML for guide: {guide_slug}" +
-          (" (preview)" if use_temp_files else ""))
+    print(f"Generated HTML for guide: {guide_slug} (preview)")
 
 
-def generate_all_guides():
-    print("🔄 Generating all guides...")
-    templates = get_templates()
+def write_file_atomic(path: Path, content: bytes):
+    """Write a file through a temporary sibling so readers never see a partial file"""
+    # Unique per writer, since build workers may write the same file concurrently
+    temp_path = path.with_name(
+        f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    temp_path.write_bytes(content)
+    os.replace(temp_path, path)
 
-    for guide_slug, guide_path in get_guides().items():
-        tutorial_json = guide_path / "tutorial.json"
-        flow_json = guide_path / "flow.json"
-        tutorial_html = guide_path / "tutorial.html"
-        flow_html = guide_path / "flow.html"
 
+def write_page_artifacts(page_file: Path, html_content: str, compress: bool = True):
+    """Write a generated page, plus gzip and brotli variants at maximum compression"""
+    content = html_content.encode("utf-8")
+    # The page is written first so compressed variants are never older than it
+    write_file_atomic(page_file, content)
+    if not compress:
+        return
+
+    write_file_atomic(page_file.with_name(page_file.name + ".gz"),
+                      gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        write_file_atomic(page_file.with_name(page_file.name + ".br"),
+                          brotli.compress(content, mode=brotli.MODE_TEXT, quality=11))
+
+
+# Build manifest: {guide_slug: build inputs}, loaded on first use
+build_manifest = None
+build_manifest_lock = threading.Lock()
+
+
+def get_build_manifest() -> Dict[str, Dict[str, Any]]:
+    """Return a copy of the build manifest"""
+    global build_manifest
+    with build_manifest_lock:
+        if build_manifest is None:
+            build_manifest = {}
+            if BUILD_MANIFEST_FILE.exists():
+                try:
+                    with open(BUILD_MANIFEST_FILE, encoding="utf-8") as f:
+                        build_manifest = json.load(f)
+                except Exception as e:
+                    print(f"⚠️ Warning: Could not read build manifest: {e}")
+        return dict(build_manifest)
+
+
+def update_build_manifest(entries: Dict[str, Optional[Dict[str, Any]]]):
+    """Record the inputs of built guides; a None entry removes a guide from the manifest"""
+    get_build_manifest()
+    with build_manifest_lock:
+        for guide_slug, inputs in entries.items():
+            if inputs is None:
+                build_manifest.pop(guide_slug, None)
+            else:
+                build_manifest[guide_slug] = inputs
+        write_file_atomic(BUILD_MANIFEST_FILE, json.dumps(
+            build_manifest, indent=2, sort_keys=True).encode("utf-8"))
+
+
+def get_guide_build_inputs(guide_slug: str) -> Dict[str, Any]:
+    """Hash everything a guide's tutorial page is generated from"""
+    guide_path = GUIDES_DIR / guide_slug
+    # Hash the templates as compiled, not as on disk: they differ until
+    # templates are reloaded when auto_reload is off
+    templates_hash = hashlib.sha256("".join(
+        get_compiled_template_hash(path.relative_to(TEMPLATES_DIR).as_posix())
+        for path in TUTORIAL_TEMPLATE_FILES).encode("utf-8")).hexdigest()
+    # The asset list lives in tutorial.json, so its hash covers asset changes
+    return {
+        "tutorial": get_file_hash(guide_path / "tutorial.json"),
+        "flow": get_file_hash(guide_path / "flow.json"),
+        "templates": templates_hash,
+        "server_highlighting": snippet_highlighter.enabled,
+    }
+
+
+def is_prebuilt_page_current(guide_slug: str) -> bool:
+    """Check that a guide's tutorial.html was generated from its current inputs"""
+    if not (GUIDES_DIR / guide_slug / "tutorial.html").exists():
+        return False
+    if build_manifest is None:
+        get_build_manifest()
+    with build_manifest_lock:
+        recorded_inputs = build_manifest.get(guide_slug)
+    return recorded_inputs is not None and recorded_inputs == get_guide_build_inputs(guide_slug)
+
+
+def build_guide(guide_slug: str) -> Dict[str, Any]:
+    """Render a guide's published tutorial page and write it to tutorial.html
+
+    Returns the build inputs the page was generated from.
+    """
+    guide_path = GUIDES_DIR / guide_slug
+    # Hash inputs before reading them, so an edit made mid-build is rebuilt next time
+    inputs = get_guide_build_inputs(guide_slug)
+    context = get_tutorial_render_context(
+        guide_slug, guide_path / "tutorial.json", guide_path / "flow.json")
+    rendered_html = get_templates()["tutorial"].render(**context)
+    write_page_artifacts(guide_path / "tutorial.html", rendered_html)
+    write_guide_meta(guide_slug)
+    return inputs
+
+
+def build_guide_isolated(guide_slug: str) -> tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+    """Build one guide, returning (slug, inputs, error) instead of raising
+
+    Used as the process pool entry point so one broken guide can't fail a whole build.
+    """
+    try:
+        return guide_slug, build_guide(guide_slug), None
+    except Exception as e:
+        return guide_slug, None, str(e)
+
+
+def generate_all_guides(force: bool = False, parallel: Optional[bool] = None,
+                        on_progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """Generate every guide whose inputs changed since its last build (all guides with force)
+
+    Builds run in a process pool when parallel is True, or when it is None and
+    at least PARALLEL_BUILD_MIN_GUIDES guides need building. on_progress is
+    called with (finished, total) as guides finish. Returns a summary of
+    built, unchanged and failed guides.
+    """
+    print("🔄 Generating all guides..." if force else "🔄 Generating changed guides...")
+    started_at = time.perf_counter()
+    manifest = get_build_manifest()
+    guides = get_guides()
+    manifest_updates = {slug: None for slug in manifest if slug not in guides}
+    pending = []
+    skipped = []
+
+    for guide_slug, guide_path in guides.items():
         # Tutorial
-        if tutorial_json.exists():
-            try:
-                with open(tutorial_json, encoding="utf-8") as f:
-                    data = json.load(f)
-                tutorial = data.get("tutorial", {})
-                assets = data.get("assets", {}) or {}
-                # Handle nested assets structure
-                if 'assets' in assets:
-                    assets = assets['assets']
-                css_links = "\n".join(
-                    f"<link rel='stylesheet' href='{href}'>" for href in assets.get("css", []) or [])
-                js_links = "\n".join(
-                    f"<script src='{src}' defer></script>" for src in assets.get("js", []) or [])
-                total_steps = sum(len(p["steps"])
-                                  for p in tutorial.get("phases", []))
-
-                # Generate flow content if flow.json exists
-                flow_content = ""
-                flow_data = None
-                if flow_json.exists():
-                    try:
-                        with open(flow_json, encoding="utf-8") as f:
-                            flow_data = json.load(f)
-                        flow_content = f'<div id="flow-data" data-flow="{json.dumps(flow_data)}"></div>'
-                        print(
-                            f"✅ Loaded flow data for {guide_slug}: {len(flow_data.get('phases', []))} phases")
-                    except Exception as e:
-                        print(
-                            f"⚠️ Warning: Could not generate flow content for {guide_slug}: {e}")
-
-                rendered_html = templates["tutorial"].render(
-                    title=tutorial.get("title", ""),
-                    description=tutorial.get("description", ""),
-                    css_links=css_links,
-                    js_links=js_links,
-                    tutorial_data=tutorial,
-                    total_steps=total_steps,
-                    flow_content=flow_content,
-                    flow_data=flow_data,
-                    tutorial_data_json=json.dumps(tutorial),
-                )
-                tutorial_html.write_text(rendered_html, encoding="utf-8")
-                print(f"✅ Generated tutorial for {guide_slug}")
-            except Exception as e:
-                print(f"❌ Error generating tutorial for {guide_slug}: {e}")
+        if not (guide_path / "tutorial.json").exists():
+            continue
 
-    print("🎉 All guides generated successfully!")
+        if (not force and (guide_path / "tutorial.html").exists()
+                and manifest.get(guide_slug) == get_guide_build_inputs(guide_slug)):
+            skipped.append(guide_slug)
+        else:
+            pending.append(guide_slug)
+
+    if parallel is None:
+        parallel = len(pending) >= PARALLEL_BUILD_MIN_GUIDES
+    workers = min(GUIDE_BUILD_WORKERS, len(pending))
+    parallel = parallel and workers > 1
+
+    results = []
+    if on_progress:
+        on_progress(0, len(pending))
+    if parallel:
+        print(f"   Building {len(pending)} guides across {workers} processes")
+        # Spawned workers don't inherit the server's threads or held locks
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {pool.submit(build_guide_isolated, slug): slug for slug in pending}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    # The worker process itself died
+                    results.append((futures[future], None, str(e)))
+                if on_progress:
+                    on_progress(len(results), len(pending))
+    else:
+        for guide_slug in pending:
+            results.append(build_guide_isolated(guide_slug))
+            if on_progress:
+                on_progress(len(results), len(pending))
+
+    built = []
+    failed = {}
+    for guide_slug, inputs, error in results:
+        if error is None:
+            built.append(guide_slug)
+            manifest_updates[guide_slug] = inputs
+            reload_catalog_entry(guide_slug)
+            print(f"✅ Generated tutorial for {guide_slug}")
+        else:
+            failed[guide_slug] = error
+            print(f"❌ Error generating tutorial for {guide_slug}: {error}")
+
+    if manifest_updates:
+        update_build_manifest(manifest_updates)
+
+    summary = {
+        "built": sorted(built),
+        "unchanged": sorted(skipped),
+        "failed": failed,
+        "parallel": parallel,
+        "duration_seconds": round(time.perf_counter() - started_at, 3),
+    }
+    print(
+        f"🎉 Guide generation finished in {summary['duration_seconds']}s: "
+        f"{len(built)} built, {len(skipped)} unchanged, {len(failed)} failed")
+    return summary
+
+
+# Progress of the background guide generation started at startup
+warmup_state = {
+    "status": "pending",
+    "started_at": None,
+    "finished_at": None,
+    "guides_total": 0,
+    "guides_done": 0,
+    "failed": {},
+    "error": None,
+}
+
+
+def report_warmup_progress(done: int, total: int):
+    """Progress callback for the startup build"""
+    warmup_state["guides_done"] = done
+    warmup_state["guides_total"] = total
+
+
+async def warm_up():
+    """Generate changed guides and prime caches without blocking startup"""
+    warmup_state["status"] = "running"
+    warmup_state["started_at"] = datetime.now().isoformat()
+    print("🔥 Warming up in the background...")
+    try:
+        await asyncio.to_thread(get_guide_catalog)
+        summary = await asyncio.to_thread(
+            generate_all_guides, on_progress=report_warmup_progress)
+        warmup_state["failed"] = summary["failed"]
+
+        # Hash the generated pages now so first requests don't pay for their ETags
+        def hash_pages():
+            for guide_path in get_guides().values():
+                page_file = guide_path / "tutorial.html"
+                for path in [page_file] + [page_file.with_name(page_file.name + suffix)
+                                           for _, suffix in PRECOMPRESSED_ENCODINGS]:
+                    get_file_hash(path)
+        await asyncio.to_thread(hash_pages)
+        await asyncio.to_thread(sync_search_index)
+
+        warmup_state["status"] = "ready"
+        print("✅ Warm-up finished")
+    except Exception as e:
+        warmup_state["status"] = "failed"
+        warmup_state["error"] = str(e)
+        print(f"❌ Warm-up failed: {e}")
+    finally:
+        warmup_state["finished_at"] = datetime.now().isoformat()
+
+
+# Background guide rebuilds, keyed by job id; queued jobs are merged per guide
+rebuild_jobs = OrderedDict()
+# Queued (not yet started) job id for each guide
+pending_rebuilds = {}
+# Ids of jobs whose debounce window has passed, in the order they become due
+rebuild_queue = None
+# Per-job debounce timers, kept referenced until they fire
+rebuild_timers = set()
+
+
+def start_rebuild_worker() -> asyncio.Task:
+    """Create the rebuild queue and start its worker on the running event loop"""
+    global rebuild_queue
+    rebuild_queue = asyncio.Queue()
+    return asyncio.create_task(run_rebuild_worker())
+
+
+def enqueue_guide_rebuild(guide_slug: str, reason: str = "") -> Dict[str, Any]:
+    """Queue a background rebuild of one guide and return its job
+
+    A guide that already has a queued job is not queued twice: the request is
+    merged into that job and its debounce window restarts, so a burst of
+    saves builds the guide once. Each guide is debounced on its own, so a
+    guide that keeps being edited doesn't hold up the others. Without a
+    running worker (the app wasn't started through its lifespan) the guide
+    is rebuilt right away on the I/O thread pool. Must be called from the
+    event loop.
+    """
+    job_id = pending_rebuilds.get(guide_slug)
+    if job_id is not None:
+        job = rebuild_jobs[job_id]
+        job["requests"] += 1
+        job["run_after"] = time.monotonic() + REBUILD_DEBOUNCE_SECONDS
+        return job
+
+    job = {
+        "id": secrets.token_hex(8),
+        "slug": guide_slug,
+        "status": "queued",
+        "reason": reason,
+        "requests": 1,
+        "queued_at": datetime.now().isoformat(),
+        "started_at": None,
+        "finished_at": None,
+        "built": None,
+        "error": None,
+        "run_after": time.monotonic() + REBUILD_DEBOUNCE_SECONDS,
+    }
+    rebuild_jobs[job["id"]] = job
+    prune_rebuild_jobs()
+    if rebuild_queue is None:
+        io_executor.submit(run_rebuild_job, job)
+        return job
+
+    pending_rebuilds[guide_slug] = job["id"]
+    timer = asyncio.create_task(wait_for_rebuild_debounce(job))
+    rebuild_timers.add(timer)
+    timer.add_done_callback(rebuild_timers.discard)
+    return job
+
+
+async def wait_for_rebuild_debounce(job: Dict[str, Any]):
+    """Hand a job to the worker once its debounce window, which merged requests restart, has passed"""
+    while (delay := job["run_after"] - time.monotonic()) > 0:
+        await asyncio.sleep(delay)
+    rebuild_queue.put_nowait(job["id"])
+
+
+def prune_rebuild_jobs():
+    """Drop the oldest finished jobs beyond REBUILD_JOB_HISTORY"""
+    finished = [job_id for job_id, job in rebuild_jobs.items()
+                if job["status"] in ("succeeded", "failed")]
+    for job_id in finished[:max(0, len(finished) - REBUILD_JOB_HISTORY)]:
+        del rebuild_jobs[job_id]
+
+
+def get_rebuild_job_info(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of a rebuild job"""
+    return {key: value for key, value in job.items() if key != "run_after"}
+
+
+async def run_rebuild_worker():
+    """Build due guides one at a time, in a thread so the event loop stays free"""
+    while True:
+        job_id = await rebuild_queue.get()
+        job = rebuild_jobs.get(job_id)
+        try:
+            if job is not None:
+                # Requests from here on queue a new job, since this build may miss them
+                if pending_rebuilds.get(job["slug"]) == job_id:
+                    del pending_rebuilds[job["slug"]]
+                await asyncio.to_thread(run_rebuild_job, job)
+        finally:
+            rebuild_queue.task_done()
+
+
+def run_rebuild_job(job: Dict[str, Any]):
+    """Rebuild a job's guide, recording the outcome on the job"""
+    guide_slug = job["slug"]
+    job["status"] = "running"
+    job["started_at"] = datetime.now().isoformat()
+    try:
+        if not (GUIDES_DIR / guide_slug / "tutorial.json").exists():
+            raise FileNotFoundError(f"tutorial.json not found for {guide_slug}")
+        # The same edit can be queued twice, e.g. by the admin API and the file watcher
+        if is_prebuilt_page_current(guide_slug):
+            job["built"] = False
+        else:
+            update_build_manifest({guide_slug: build_guide(guide_slug)})
+            invalidate_rendered_pages(guide_slug)
+            reload_catalog_entry(guide_slug)
+            job["built"] = True
+            print(f"✅ Regenerated tutorial for {guide_slug} ({job['requests']} requests)")
+        update_search_index(guide_slug)
+        job["status"] = "succeeded"
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+        print(f"❌ Error regenerating tutorial for {guide_slug}: {e}")
+    finally:
+        job["finished_at"] = datetime.now().isoformat()
+
+
+def update_search_index(guide_slug: str, source_hash: Optional[str] = None):
+    """Index a guide's published content for search, skipping it if unchanged"""
+    search_index.load()
+    guide_path = GUIDES_DIR / guide_slug
+    tutorial_json = guide_path / "tutorial.json"
+    flow_json = guide_path / "flow.json"
+    if not tutorial_json.exists():
+        search_index.remove_guide(guide_slug)
+        return
+
+    if source_hash is None:
+        source_hash = f"{get_file_hash(tutorial_json)}:{get_file_hash(flow_json)}"
+    if search_index.get_source_hash(guide_slug) == source_hash:
+        return
+    tutorial_data = (read_guide_json(tutorial_json) or {}).get("tutorial") or {}
+    flow_data = read_guide_json(flow_json) or {}
+    search_index.update_guide(guide_slug, tutorial_data, flow_data, source_hash)
+    print(f"🔎 Indexed {guide_slug} for search")
+
+
+def sync_search_index():
+    """Bring the search index in line with the published guides"""
+    search_index.load()
+    published = {guide_slug: entry for guide_slug, entry in get_guide_catalog().items()
+                 if entry["has_tutorial"]}
+    for guide_slug in search_index.get_indexed_guides():
+        if guide_slug not in published:
+            search_index.remove_guide(guide_slug)
+    # Catalog hashes come from the guides' sidecars, so unchanged guides aren't read
+    for guide_slug, entry in published.items():
+        update_search_index(guide_slug, f"{entry['tutorial_hash']}:{entry['flow_hash']}")
+
+
+# Guide files a tutorial page is built from
+GUIDE_SOURCE_FILES = {"tutorial.json", "flow.json"}
+
+
+def is_watched_file(change, path: str) -> bool:
+    """watchfiles filter: skip build outputs, previews and temporary files"""
+    name = os.path.basename(path)
+    return not (name.startswith(".") or name.startswith("temp_")
+                or name.startswith("tutorial.html") or name.endswith("~"))
+
+
+def start_guide_watcher(stop_event: asyncio.Event) -> Optional[asyncio.Task]:
+    """Start watching GUIDES_DIR and TEMPLATES_DIR until stop_event is set"""
+    if awatch is None:
+        print("⚠️ watchfiles is not installed, guide watcher disabled")
+        return None
+    return asyncio.create_task(watch_guide_files(stop_event))
+
+
+async def watch_guide_files(stop_event: asyncio.Event):
+    """Invalidate caches and queue rebuilds for guides whose files change on disk"""
+    print(f"👀 Watching {GUIDES_DIR} and {TEMPLATES_DIR} for changes")
+    async for changes in awatch(GUIDES_DIR, TEMPLATES_DIR, watch_filter=is_watched_file,
+                                stop_event=stop_event):
+        try:
+            # File and template work runs on the I/O pool; rebuilds are queued from the loop
+            for guide_slug in await run_io(handle_file_changes, changes):
+                enqueue_guide_rebuild(guide_slug, "file-watcher")
+        except Exception as e:
+            print(f"❌ Error handling file changes: {e}")
+
+
+def handle_file_changes(changes) -> list:
+    """Map a batch of changed paths to the guides they affect, returning the guides to rebuild"""
+    changed_guides = set()
+    catalog_guides = set()
+    tutorial_templates_changed = False
+    templates_changed = False
+
+    for change, path in changes:
+        path = Path(path)
+        if path.is_relative_to(TEMPLATES_DIR):
+            templates_changed = True
+            tutorial_templates_changed |= path in TUTORIAL_TEMPLATE_FILES
+            continue
+
+        relative = path.relative_to(GUIDES_DIR)
+        if len(relative.parts) == 1:
+            # The guide directory itself was added or removed
+            catalog_guides.add(relative.parts[0])
+            if change == Change.deleted:
+                changed_guides.add(relative.parts[0])
+        elif len(relative.parts) == 2 and relative.name in GUIDE_SOURCE_FILES:
+            changed_guides.add(relative.parts[0])
+        elif len(relative.parts) == 2 and relative.name == "draft.json":
+            catalog_guides.add(relative.parts[0])
+
+    if templates_changed:
+        # Clears every rendered page and fragment
+        reload_templates()
+    if tutorial_templates_changed:
+        changed_guides.update(get_guides())
+
+    for guide_slug in catalog_guides | changed_guides:
+        refresh_catalog_entry(guide_slug)
+
+    rebuild = []
+    for guide_slug in sorted(changed_guides):
+        invalidate_rendered_pages(guide_slug)
+        if (GUIDES_DIR / guide_slug / "tutorial.json").exists():
+            rebuild.append(guide_slug)
+        else:
+            update_build_manifest({guide_slug: None})
+            search_index.remove_guide(guide_slug)
+    if changed_guides:
+        print(f"👀 Files changed, rebuilding: {', '.join(sorted(changed_guides))}")
+    return rebuild
+
+
+# Admin handlers run their file I/O here, so a slow disk write holds up a
+# pool thread instead of every request on the event loop
+io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="guide-io")
+
+
+async def run_io(func: Callable, *args, **kwargs):
+    """Run a blocking function on the I/O thread pool and wait for its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor, functools.partial(func, *args, **kwargs))
+
+
+def read_json_file(path: Path) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json_file(path: Path, data: Any):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def render_admin_template(name: str, **context) -> str:
+    """Load (possibly from disk) and render an admin page template"""
+    return get_jinja_env().get_template(name).render(**context)
+
+
+# Seconds between event loop lag samples, and the lag that gets logged
+EVENT_LOOP_LAG_INTERVAL = 0.5
+EVENT_LOOP_LAG_WARNING = 0.25
+# Recent lag samples in seconds, about the last minute
+event_loop_lag = deque(maxlen=120)
+
+
+async def monitor_event_loop_lag():
+    """Sleep repeatedly and record how much later than scheduled each wakeup is"""
+    while True:
+        started_at = time.perf_counter()
+        await asyncio.sleep(EVENT_LOOP_LAG_INTERVAL)
+        lag = max(0.0, time.perf_counter() - started_at - EVENT_LOOP_LAG_INTERVAL)
+        event_loop_lag.append(lag)
+        if lag >= EVENT_LOOP_LAG_WARNING:
+            print(f"⚠️ Event loop blocked for {lag * 1000:.0f} ms")
+
+
+@app.get("/healthz")
+def healthz():
+    """Liveness check: the process is up and serving requests"""
+    samples = list(event_loop_lag)
+    return {
+        "status": "ok",
+        "event_loop_lag_ms": {
+            "current": round(samples[-1] * 1000, 2) if samples else None,
+            "max": round(max(samples) * 1000, 2) if samples else None,
+            "samples": len(samples)
+        }
+    }
+
+
+@app.get("/readyz")
+def readyz():
+    """Readiness check: 503 until the startup warm-up has finished, or if it failed"""
+    ready = warmup_state["status"] == "ready"
+    return Response(
+        content=json.dumps({"ready": ready, "warmup": warmup_state}),
+        status_code=200 if ready else 503,
+        media_type="application/json"
+    )
 
 
 @app.get("/guides/{guide_slug}/draft.json")
-def serve_draft_json(guide_slug: str):
+def serve_draft_json(guide_slug: str, request: Request):
     """Serve draft.json file for a guide"""
     guide_path = GUIDES_DIR / guide_slug
     draft_file = guide_path / "draft.json"
@@ -476,13 +1678,20 @@ def serve_draft_json(guide_slug: str):
     if not draft_file.exists():
         raise HTTPException(status_code=404, detail="Draft not found")
 
-    try:
-        with open(draft_file, 'r', encoding='utf-8') as f:
-            draft_data = json.load(f)
-        return draft_data
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Failed to read draft: {str(e)}")
+    # Sent as saved, revalidated against its content hash
+    return serve_guide_data_file(request, draft_file, None)
+
+
+@app.get("/guides/{guide_slug}/data.json")
+def serve_tutorial_data(guide_slug: str, request: Request, v: Optional[str] = None):
+    """Serve a guide's published tutorial data for its tutorial page"""
+    return serve_guide_data_file(request, GUIDES_DIR / guide_slug / "tutorial.json", v)
+
+
+@app.get("/guides/{guide_slug}/flow.json")
+def serve_flow_data(guide_slug: str, request: Request, v: Optional[str] = None):
+    """Serve a guide's published flow data for its tutorial page"""
+    return serve_guide_data_file(request, GUIDES_DIR / guide_slug / "flow.json", v)
 
 
 @app.get("/guides/{guide_slug}/tutorial")
@@ -517,103 +1726,102 @@ def serve_guide_tutorial(guide_slug: str, request: Request):
     if not tutorial_json.exists():
         return Response("<h1>Tutorial not found</h1>", media_type="text/html")
 
-    # Load tutorial data
-    with open(tutorial_json, encoding="utf-8") as f:
-        data = json.load(f)
-    tutorial = data.get("tutorial", {})
-    assets = data.get("assets", {}) or {}
-    # Handle nested assets structure
-    if 'assets' in assets:
-        assets = assets['assets']
-    css_links = "\n".join(
-        f"<link rel='stylesheet' href='{href}'>" for href in assets.get("css", []) or [])
-    js_links = "\n".join(
-        f"<script src='{src}' defer></script>" for src in assets.get("js", []) or [])
-    total_steps = sum(len(p["steps"]) for p in tutorial.get("phases", []))
+    # Serve the page written by the guide build while its sources are unchanged
+    if (not is_preview and TUTORIAL_SERVE_MODE == "prebuilt"
+            and is_prebuilt_page_current(guide_slug)):
+        return serve_prebuilt_page(request, tutorial_html)
+
+    # Otherwise published pages are rendered once per change to their source files
+    fingerprint = get_source_fingerprint(
+        tutorial_json, flow_json, *TUTORIAL_TEMPLATE_FILES)
+    if not is_preview:
+        cached_html = get_cached_page(guide_slug, fingerprint)
+        if cached_html is not None:
+            return Response(content=cached_html, media_type="text/html")
+
+    context = get_tutorial_render_context(
+        guide_slug, tutorial_json, flow_json, data_urls=not is_preview)
+    context["is_preview"] = is_preview
+    templates = get_templates()
 
-    # Generate flow content if flow.json exists
-    flow_content = ""
-    flow_data = None
-    if flow_json.exists():
-        try:
-            with open(flow_json, encoding="utf-8") as f:
-                flow_data = json.load(f)
-            flow_content = f'<div id="flow-data" data-flow="{json.dumps(flow_data)}"></div>'
-            print(
-                f"✅ Loaded flow data for {guide_slug}: {len(flow_data.get('phases', []))} phases")
-        except Exception as e:
-            print(f"❌ Error loading flow data for {guide_slug}: {e}")
-    else:
-        print(f"⚠️ No flow.json found for {guide_slug}")
+    if TUTORIAL_SERVE_MODE == "stream":
+        return StreamingResponse(
+            stream_tutorial_page(guide_slug, templates["tutorial"], context,
+                                 None if is_preview else fingerprint),
+            media_type="text/html")
 
-    templates = get_templates()
-    print(
-        f"🔍 Debug: flow_data type: {type(flow_data)}, flow_data content: {flow_data is not None}")
-    if flow_data:
-        print(
-            f"🔍 Debug: flow_data has {len(flow_data.get('phases', []))} phases")
-    rendered_html = templates["tutorial"].render(
-        title=tutorial.get("title", ""),
-        description=tutorial.get("description", ""),
-        css_links=css_links,
-        js_links=js_links,
-        tutorial_data=tutorial,
-        total_steps=total_steps,
-        flow_content=flow_content,
-        flow_data=flow_data,
-        tutorial_data_json=json.dumps(tutorial),
-        is_preview=is_preview
-    )
+    rendered_html = templates["tutorial"].render(**context).encode("utf-8")
+
+    if not is_preview:
+        store_cached_page(guide_slug, fingerprint, rendered_html)
     return Response(content=rendered_html, media_type="text/html")
 
 
 @app.get("/guides")
-def list_guides():
+def list_guides(request: Request):
     """Return only published guides with their slug, titles and descriptions"""
-    guides = get_guides()
-    guides_data = []
-
-    for guide_slug, guide_path in guides.items():
-        tutorial_json = guide_path / "tutorial.json"
-
-        if tutorial_json.exists():
-            try:
-                with open(tutorial_json, encoding="utf-8") as f:
-                    data = json.load(f)
-                    tutorial_data = data.get("tutorial", {})
-                    title = tutorial_data.get("title", guide_slug)
-                    description = tutorial_data.get("description", "")
-                guides_data.append({
-                    "slug": guide_slug,
-                    "title": title,
-                    "description": description
-                })
-            except Exception as e:
-                print(
-                    f"Warning: Could not read tutorial.json for {guide_slug}: {e}")
-
-    return guides_data
+    catalog_hash, catalog_updated_at = get_catalog_version()
+    return conditional_json_response(request, f'W/"guides-{catalog_hash[:32]}"', lambda: [
+        {
+            "slug": entry["slug"],
+            "title": entry["title"],
+            "description": entry["description"]
+        }
+        for entry in get_guide_catalog().values() if entry["has_tutorial"]
+    ], catalog_updated_at)
 
 
 @app.get("/guides/{guide_slug}/stats")
-def get_guide_view_stats(guide_slug: str):
+def get_guide_view_stats(guide_slug: str, request: Request):
     """Get view statistics for a specific guide"""
     guide_path = GUIDES_DIR / guide_slug
     if not guide_path.exists():
         raise HTTPException(status_code=404, detail="Guide not found")
 
-    stats = get_guide_stats(guide_slug)
-    return {
-        "slug": guide_slug,
-        "total_views": stats["total_views"],
-        "unique_viewers": stats["unique_viewers"]
-    }
+    # Stats only change when a view of this guide is tracked or the counters are rebuilt
+    view_version = view_tracker.get_view_version(guide_slug)
+
+    def get_content():
+        stats = get_guide_stats(guide_slug)
+        return {
+            "slug": guide_slug,
+            "total_views": stats["total_views"],
+            "unique_viewers": stats["unique_viewers"]
+        }
+    return conditional_json_response(request, f'W/"stats-{guide_slug}-{view_version}"', get_content)
+
+
+MAX_STATS_SLUGS = 500
+
+
+@app.get("/guides/stats")
+def get_guides_view_stats(request: Request, slugs: str = ""):
+    """Get view statistics for several guides at once
+
+    slugs is a comma separated list of guide slugs. Guides without views,
+    or that don't exist, have zero counts.
+    """
+    guide_slugs = list(dict.fromkeys(slug.strip() for slug in slugs.split(",") if slug.strip()))
+    if not guide_slugs:
+        raise HTTPException(status_code=400, detail="slugs is required")
+    if len(guide_slugs) > MAX_STATS_SLUGS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_STATS_SLUGS} slugs can be requested at once")
+
+    view_version = view_tracker.get_view_version()
+    etag = 'W/"stats-bulk-{}-{}"'.format(
+        hashlib.sha256("\0".join(guide_slugs).encode("utf-8")).hexdigest()[:16], view_version)
+
+    def get_content():
+        stats = view_tracker.get_stats_bulk(guide_slugs)
+        return {"stats": [{"slug": guide_slug, **stats[guide_slug]} for guide_slug in guide_slugs]}
+    return conditional_json_response(request, etag, get_content)
 
 
 @app.get("/admin/stats")
 def get_overall_stats(current_user: bool = Depends(get_current_user_flexible)):
     """Get overall statistics for the dashboard"""
-    guides = get_guides()
+    guides = get_guide_catalog()
 
     # Get overall stats from database
     db_stats = view_tracker.get_overall_stats()
@@ -623,13 +1831,9 @@ def get_overall_stats(current_user: bool = Depends(get_current_user_flexible)):
     draft_guides = 0
     published_with_draft_guides = 0
 
-    for guide_slug in guides.keys():
-        guide_path = guides[guide_slug]
-        tutorial_json = guide_path / "tutorial.json"
-        draft_json = guide_path / "draft.json"
-
-        has_published = tutorial_json.exists()
-        has_draft = draft_json.exists()
+    for entry in guides.values():
+        has_published = entry["has_tutorial"]
+        has_draft = entry["has_draft"]
 
         if has_published:
             published_guides += 1
@@ -646,7 +1850,8 @@ def get_overall_stats(current_user: bool = Depends(get_current_user_flexible)):
         "draft_guides": draft_guides,
         "published_with_draft_guides": published_with_draft_guides,
         "total_views": db_stats["total_views"],
-        "unique_viewers": db_stats["total_unique_viewers"]
+        "unique_viewers": db_stats["total_unique_viewers"],
+        "view_ingestion": view_tracker.get_ingestion_stats()
     }
 
 
@@ -656,120 +1861,234 @@ def get_top_guides(current_user: bool = Depends(get_current_user_flexible)):
     top_guides = view_tracker.get_top_guides(limit=3)
 
     # Add guide titles to the results
-    guides = get_guides()
+    guides = get_guide_catalog()
     for guide in top_guides:
-        guide_slug = guide["slug"]
-        guide_path = guides.get(guide_slug)
-        if guide_path:
-            tutorial_json = guide_path / "tutorial.json"
-            if tutorial_json.exists():
-                try:
-                    with open(tutorial_json, encoding="utf-8") as f:
-                        data = json.load(f)
-                        tutorial_data = data.get("tutorial", {})
-                        guide["title"] = tutorial_data.get("title", guide_slug)
-                except:
-                    guide["title"] = guide_slug
-            else:
-                guide["title"] = guide_slug
-        else:
-            guide["title"] = guide_slug
+        entry = guides.get(guide["slug"])
+        # Draft titles aren't shown for published view counts
+        guide["title"] = entry["title"] if entry and entry["has_tutorial"] else guide["slug"]
 
     return {"top_guides": top_guides}
 
 
-@app.get("/guides/api/guides")
-def get_guides_with_titles():
-    """Return all guides with their titles, links, and statistics"""
-    guides = get_guides()
-    guides_data = []
+@app.get("/admin/stats/unique-viewers")
+def get_unique_viewers(slug: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None,
+                       current_user: bool = Depends(get_current_user_flexible)):
+    """Count unique viewers of a guide, or of all guides, between two dates
 
-    for guide_slug, guide_path in guides.items():
-        tutorial_json = guide_path / "tutorial.json"
-        flow_json = guide_path / "flow.json"
-        draft_json = guide_path / "draft.json"
+    start and end are inclusive YYYY-MM-DD dates and default to all time.
+    In "hll" mode the count is an estimate and relative_error is its standard error.
+    """
+    for value in (start, end):
+        if value is not None:
+            try:
+                datetime.strptime(value, "%Y-%m-%d")
+            except ValueError:
+                raise HTTPException(
+                    status_code=400, detail=f"Invalid date '{value}', expected YYYY-MM-DD")
 
-        # Default values
-        title = guide_slug
-        description = ""
-        tutorial_data = None
-        flow_data = None
+    result = view_tracker.get_unique_viewers(slug, start, end)
+    return {"slug": slug, "start": start, "end": end, **result}
 
-        # Check if draft exists and if published files exist
-        has_draft = draft_json.exists()
-        has_published = tutorial_json.exists() or flow_json.exists()
 
-        # Try to get tutorial data (prefer published, fallback to draft)
-        if tutorial_json.exists():
-            try:
-                with open(tutorial_json, encoding="utf-8") as f:
-                    data = json.load(f)
-                    tutorial_data = data.get("tutorial", {})
-                    title = tutorial_data.get("title", guide_slug)
-                    description = tutorial_data.get("description", "")
-            except Exception as e:
-                print(
-                    f"Warning: Could not read tutorial.json for {guide_slug}: {e}")
-        elif draft_json.exists():
-            try:
-                with open(draft_json, encoding="utf-8") as f:
-                    data = json.load(f)
-                    tutorial_data = data.get("tutorial", {})
-                    title = tutorial_data.get("title", guide_slug)
-                    description = tutorial_data.get("description", "")
-            except Exception as e:
-                print(
-                    f"Warning: Could not read draft.json for {guide_slug}: {e}")
-
-        # Try to get flow data (prefer published, fallback to draft)
-        if flow_json.exists():
-            try:
-                with open(flow_json, encoding="utf-8") as f:
-                    flow_data = json.load(f)
-            except Exception as e:
-                print(
-                    f"Warning: Could not read flow.json for {guide_slug}: {e}")
-        elif draft_json.exists():
+@app.get("/admin/stats/timeseries")
+def get_view_timeseries(interval: str = "day", slug: Optional[str] = None, start: Optional[str] = None,
+                        end: Optional[str] = None, current_user: bool = Depends(get_current_user_flexible)):
+    """Views per hour or per day, for a guide or all guides
+
+    start and end are inclusive YYYY-MM-DD dates, or YYYY-MM-DD HH hours
+    with interval=hour. Buckets without views are left out.
+    """
+    if interval not in ("hour", "day"):
+        raise HTTPException(status_code=400, detail="interval must be 'hour' or 'day'")
+    for value in (start, end):
+        if value is not None:
             try:
-                with open(draft_json, encoding="utf-8") as f:
-                    data = json.load(f)
-                    flow_data = data.get("flow", {})
-            except Exception as e:
-                print(
-                    f"Warning: Could not read draft.json for {guide_slug}: {e}")
-
-        # Get view statistics for published guides
-        view_stats = get_guide_stats(guide_slug) if has_published else {
-            "total_views": 0, "unique_viewers": 0}
-
-        guides_data.append({
-            "slug": guide_slug,
-            "title": title,
-            "description": description,
-            "tutorial_url": f"/guides/{guide_slug}/tutorial",
-            "tutorial": tutorial_data,
-            "flow": flow_data,
-            "has_draft": has_draft,
-            "has_published": has_published,
-            "view_stats": view_stats
-        })
+                datetime.strptime(value, "%Y-%m-%d %H" if len(value) > 10 else "%Y-%m-%d")
+            except ValueError:
+                raise HTTPException(
+                    status_code=400, detail=f"Invalid date '{value}', expected YYYY-MM-DD or YYYY-MM-DD HH")
+
+    return {
+        "interval": interval,
+        "slug": slug,
+        "buckets": view_tracker.get_timeseries(interval, slug, start, end)
+    }
+
+
+MAX_SEARCH_RESULTS = 50
+
+
+@app.get("/guides/search")
+def search_guides(q: str = "", limit: int = 10, slug: Optional[str] = None):
+    """Search published guides by phase, step and flow step text
+
+    Results are guide sections ranked by relevance, with HTML snippets
+    that wrap matching words in <mark>. slug limits results to one guide.
+    """
+    if not 1 <= limit <= MAX_SEARCH_RESULTS:
+        raise HTTPException(
+            status_code=400, detail=f"limit must be between 1 and {MAX_SEARCH_RESULTS}")
+
+    started_at = time.perf_counter()
+    search_index.load()
+    results = search_index.search(q, limit=limit, guide_slug=slug)
+    for result in results:
+        result["tutorial_url"] = f"/guides/{result['slug']}/tutorial"
+    return {
+        "query": q,
+        "results": results,
+        "took_ms": round((time.perf_counter() - started_at) * 1000, 2)
+    }
+
+
+# Fields returned by /guides/api/guides when no fields are requested
+GUIDE_SUMMARY_FIELDS = [
+    "slug", "title", "description", "tutorial_url", "has_draft", "has_published",
+    "phase_count", "step_count", "flow_step_count", "published_at", "html_size", "view_stats",
+]
+# Full guide content, only returned when asked for by name
+GUIDE_CONTENT_FIELDS = ["tutorial", "flow"]
+MAX_GUIDES_PAGE_SIZE = 500
+
+
+def get_guide_content(guide_slug: str) -> tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Load a guide's full tutorial and flow data (prefer published, fallback to draft)"""
+    guide_path = GUIDES_DIR / guide_slug
+    draft_data = None
+    published_data = read_guide_json(guide_path / "tutorial.json")
+    flow_data = read_guide_json(guide_path / "flow.json")
+    if published_data is None or flow_data is None:
+        draft_data = read_guide_json(guide_path / "draft.json")
+    source_data = published_data if published_data is not None else draft_data
+    tutorial_data = source_data.get("tutorial", {}) if source_data is not None else None
+    if flow_data is None and draft_data is not None:
+        flow_data = draft_data.get("flow", {})
+    return tutorial_data, flow_data
+
+
+@app.get("/guides/api/guides")
+def get_guides_with_titles(request: Request, fields: Optional[str] = None, limit: Optional[int] = None, cursor: Optional[str] = None, slug: Optional[str] = None):
+    """Return guides with their titles, links, and statistics
+
+    Only summary fields are returned by default. fields is a comma separated
+    list of fields to return instead, e.g. fields=slug,title,tutorial,flow.
+    Guides are ordered by slug; with limit, pass the returned next_cursor
+    as cursor to get the following page. slug returns just that guide.
+    """
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = set(requested) - set(GUIDE_SUMMARY_FIELDS + GUIDE_CONTENT_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        # The slug is always returned so results can be matched up
+        requested = ["slug"] + [field for field in requested if field != "slug"]
+    else:
+        requested = GUIDE_SUMMARY_FIELDS
+    if limit is not None and not 1 <= limit <= MAX_GUIDES_PAGE_SIZE:
+        raise HTTPException(
+            status_code=400, detail=f"limit must be between 1 and {MAX_GUIDES_PAGE_SIZE}")
+
+    # Entries hold content hashes, so the catalog version covers tutorial and flow too
+    catalog_hash, catalog_updated_at = get_catalog_version()
+    version = [catalog_hash, requested, limit, cursor, slug]
+    if "view_stats" in requested:
+        version.append(view_tracker.get_view_version())
+    etag = 'W/"guides-api-{}"'.format(
+        hashlib.sha256(json.dumps(version).encode("utf-8")).hexdigest()[:32])
+    return conditional_json_response(
+        request, etag, lambda: get_guides_listing(requested, limit, cursor, slug),
+        None if "view_stats" in requested else catalog_updated_at)
+
+
+def get_guides_listing(requested: list, limit: Optional[int], cursor: Optional[str],
+                       slug: Optional[str] = None) -> Dict[str, Any]:
+    """Build a page of /guides/api/guides"""
+    catalog = get_guide_catalog()
+    # The cursor is the last slug of the previous page
+    page = [entry for guide_slug, entry in catalog.items()
+            if (cursor is None or guide_slug > cursor)
+            and (slug is None or guide_slug == slug)]
+    next_cursor = None
+    if limit is not None and len(page) > limit:
+        page = page[:limit]
+        next_cursor = page[-1]["slug"]
+
+    # View statistics of the page's published guides, fetched in one query
+    view_stats = {}
+    if "view_stats" in requested:
+        view_stats = view_tracker.get_stats_bulk(
+            [entry["slug"] for entry in page if entry["has_published"]])
+
+    guides_data = []
+    for entry in page:
+        guide_slug = entry["slug"]
+        guide = {}
+        for field in requested:
+            if field == "tutorial_url":
+                guide[field] = f"/guides/{guide_slug}/tutorial"
+            elif field == "view_stats":
+                guide[field] = view_stats.get(guide_slug, {"total_views": 0, "unique_viewers": 0})
+            elif field not in GUIDE_CONTENT_FIELDS:
+                guide[field] = entry[field]
+
+        # Only read guide files when their content was asked for
+        if any(field in GUIDE_CONTENT_FIELDS for field in requested):
+            tutorial_data, flow_data = get_guide_content(guide_slug)
+            if "tutorial" in requested:
+                guide["tutorial"] = tutorial_data
+            if "flow" in requested:
+                guide["flow"] = flow_data
+        guides_data.append(guide)
 
     return {
         "guides": guides_data,
-        "total": len(guides_data)
+        "total": len(catalog),
+        "next_cursor": next_cursor
     }
 
 
 @app.post("/regenerate")
-async def regenerate_all_guides(current_user: bool = Depends(get_current_user_flexible)):
-    """Manually regenerate all guides (useful for development)"""
+async def regenerate_all_guides(force: bool = False, parallel: Optional[bool] = None, current_user: bool = Depends(get_current_user_flexible)):
+    """Manually regenerate changed guides, or every guide with force (useful for development)"""
     try:
-        generate_all_guides()
-        return {"status": "success", "message": "All guides regenerated successfully"}
+        summary = await run_io(generate_all_guides, force=force, parallel=parallel)
+        invalidate_rendered_pages()
+        await run_io(sync_search_index)
+        if summary["failed"]:
+            return {"status": "error", "message": f"{len(summary['failed'])} guides failed to regenerate", "summary": summary}
+        return {"status": "success", "message": "All guides regenerated successfully", "summary": summary}
     except Exception as e:
         return {"status": "error", "message": f"Failed to regenerate guides: {str(e)}"}
 
 
+@app.post("/admin/reload-templates")
+async def reload_templates_endpoint(current_user: bool = Depends(get_current_user_flexible)):
+    """Reload templates from disk without restarting the server"""
+    try:
+        await run_io(reload_templates)
+        return {"status": "success", "message": "Templates reloaded successfully"}
+    except Exception as e:
+        return {"status": "error", "message": f"Failed to reload templates: {str(e)}"}
+
+
+@app.get("/admin/regeneration-jobs")
+async def list_regeneration_jobs(status: Optional[str] = None, current_user: bool = Depends(get_current_user_flexible)):
+    """List recent background guide rebuilds, newest first"""
+    jobs = [get_rebuild_job_info(job) for job in reversed(rebuild_jobs.values())
+            if status is None or job["status"] == status]
+    return {"jobs": jobs, "queued": len(pending_rebuilds)}
+
+
+@app.get("/admin/regeneration-jobs/{job_id}")
+async def get_regeneration_job(job_id: str, current_user: bool = Depends(get_current_user_flexible)):
+    """Get the status of a background guide rebuild"""
+    job = rebuild_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Regeneration job not found")
+    return get_rebuild_job_info(job)
+
+
 @app.post("/save-tutorial")
 async def save_tutorial(request: Request, current_user: bool = Depends(get_current_user_flexible)):
     """Save tutorial changes to the JSON file"""
@@ -800,9 +2119,9 @@ async def save_tutorial(request: Request, current_user: bool = Depends(get_curre
         tutorial_json = guide_path / "tutorial.json"
 
         print(f"   Guide path: {guide_path}")
-        print(f"   Tutorial JSON exists: {tutorial_json.exists()}")
+        print(f"   Tutorial JSON exists: {await run_io(tutorial_json.exists)}")
 
-        if not tutorial_json.exists():
+        if not await run_io(tutorial_json.exists):
             print(f"   ❌ Tutorial file not found for {guide_slug}")
             return Response(
                 content=json.dumps(
@@ -811,8 +2130,7 @@ async def save_tutorial(request: Request, current_user: bool = Depends(get_curre
             )
 
         # Load existing data to preserve other fields (like assets)
-        with open(tutorial_json, encoding="utf-8") as f:
-            existing_data = json.load(f)
+        existing_data = await run_io(read_json_file, tutorial_json)
 
         print(f"   ✅ Loaded existing data")
 
@@ -820,19 +2138,20 @@ async def save_tutorial(request: Request, current_user: bool = Depends(get_curre
         existing_data["tutorial"] = tutorial_data
 
         # Save back to file
-        with open(tutorial_json, "w", encoding="utf-8") as f:
-            json.dump(existing_data, f, indent=2, ensure_ascii=False)
+        await run_io(write_json_file, tutorial_json, existing_data)
 
         print(f"   ✅ Saved updated data")
 
-        # Regenerate the HTML
-        generate_all_guides()
+        # Pages render from the new data right away; the HTML is rebuilt in the background
+        invalidate_rendered_pages(guide_slug)
+        await run_io(refresh_catalog_entry, guide_slug, published=True)
+        job = enqueue_guide_rebuild(guide_slug, "save-tutorial")
 
-        print(f"   ✅ Regenerated HTML")
+        print(f"   ✅ Queued HTML regeneration ({job['id']})")
 
         return Response(
             content=json.dumps(
-                {"status": "success", "message": "Tutorial saved successfully"}),
+                {"status": "success", "message": "Tutorial saved successfully", "job_id": job["id"]}),
             media_type="application/json"
         )
 
@@ -892,17 +2211,17 @@ async def save_draft(request: Request, current_user: bool = Depends(get_current_
 
         # Check if guide already exists (for new guides)
         guide_dir = GUIDES_DIR / guide_data.basic_info.slug
-        if guide_dir.exists() and not (guide_dir / "draft.json").exists():
+        if await run_io(guide_dir.exists) and not await run_io((guide_dir / "draft.json").exists):
             # This is a new guide trying to use an existing slug
             return {"status": "error", "message": f"Guide with slug '{guide_data.basic_info.slug}' already exists. Please choose a different slug."}
 
         # Create guide directory if it doesn't exist
-        guide_dir.mkdir(exist_ok=True)
+        await run_io(guide_dir.mkdir, exist_ok=True)
 
         # Save draft
         draft_file = guide_dir / "draft.json"
-        with open(draft_file, "w", encoding="utf-8") as f:
-            json.dump(body, f, indent=2, ensure_ascii=False)
+        await run_io(write_json_file, draft_file, body)
+        await run_io(refresh_catalog_entry, guide_data.basic_info.slug)
 
         return {"status": "success", "message": "Draft saved successfully"}
     except Exception as e:
@@ -923,12 +2242,13 @@ async def publish_guide(request: Request, current_user: bool = Depends(get_curre
 
         # Check if guide already exists (for new guides)
         guide_dir = GUIDES_DIR / guide_data.basic_info.slug
-        if guide_dir.exists() and not (guide_dir / "draft.json").exists() and not (guide_dir / "tutorial.json").exists():
+        if (await run_io(guide_dir.exists) and not await run_io((guide_dir / "draft.json").exists)
+                and not await run_io((guide_dir / "tutorial.json").exists)):
             # This is a new guide trying to use an existing slug
             return {"status": "error", "message": f"Guide with slug '{guide_data.basic_info.slug}' already exists. Please choose a different slug."}
 
         # Create guide directory
-        guide_dir.mkdir(exist_ok=True)
+        await run_io(guide_dir.mkdir, exist_ok=True)
 
         # Generate tutorial.json with exact structure
         tutorial_json = {
@@ -965,8 +2285,7 @@ async def publish_guide(request: Request, current_user: bool = Depends(get_curre
 
         # Save tutorial.json
         tutorial_file = guide_dir / "tutorial.json"
-        with open(tutorial_file, "w", encoding="utf-8") as f:
-            json.dump(tutorial_json, f, indent=2, ensure_ascii=False)
+        await run_io(write_json_file, tutorial_file, tutorial_json)
 
         # Generate flow.json with exact structure
         flow_json = {
@@ -998,13 +2317,14 @@ async def publish_guide(request: Request, current_user: bool = Depends(get_curre
 
         # Save flow.json
         flow_file = guide_dir / "flow.json"
-        with open(flow_file, "w", encoding="utf-8") as f:
-            json.dump(flow_json, f, indent=2, ensure_ascii=False)
+        await run_io(write_json_file, flow_file, flow_json)
 
-        # Regenerate HTML
-        generate_all_guides()
+        # Regenerate HTML in the background
+        invalidate_rendered_pages(guide_data.basic_info.slug)
+        await run_io(refresh_catalog_entry, guide_data.basic_info.slug, published=True)
+        job = enqueue_guide_rebuild(guide_data.basic_info.slug, "publish-guide")
 
-        return {"status": "success", "message": "Guide published successfully"}
+        return {"status": "success", "message": "Guide published successfully", "job_id": job["id"]}
     except Exception as e:
         return {"status": "error", "message": f"Failed to publish guide: {str(e)}"}
 
@@ -1021,11 +2341,11 @@ async def update_guide(guide_slug: str, request: Request, current_user: bool = D
 
         # Check if guide exists
         guide_dir = GUIDES_DIR / guide_slug
-        if not guide_dir.exists():
+        if not await run_io(guide_dir.exists):
             return {"status": "error", "message": f"Guide '{guide_slug}' not found"}
 
         # Create guide directory if it doesn't exist
-        guide_dir.mkdir(exist_ok=True)
+        await run_io(guide_dir.mkdir, exist_ok=True)
 
         # Save as draft.json instead of overwriting published files
         draft_file = guide_dir / "draft.json"
@@ -1037,8 +2357,8 @@ async def update_guide(guide_slug: str, request: Request, current_user: bool = D
         print(
             f"   YouTube video: {guide_data.get('tutorial', {}).get('youtube_video', 'N/A')}")
 
-        with open(draft_file, "w", encoding="utf-8") as f:
-            json.dump(guide_data, f, indent=2, ensure_ascii=False)
+        await run_io(write_json_file, draft_file, guide_data)
+        await run_io(refresh_catalog_entry, guide_slug)
 
         return {"status": "success", "message": "Draft saved successfully"}
     except Exception as e:
@@ -1051,17 +2371,16 @@ async def publish_from_draft(guide_slug: str, current_user: bool = Depends(get_c
     try:
         # Check if guide exists
         guide_dir = GUIDES_DIR / guide_slug
-        if not guide_dir.exists():
+        if not await run_io(guide_dir.exists):
             return {"status": "error", "message": f"Guide '{guide_slug}' not found"}
 
         # Check if draft exists
         draft_file = guide_dir / "draft.json"
-        if not draft_file.exists():
+        if not await run_io(draft_file.exists):
             return {"status": "error", "message": "No draft found to publish"}
 
         # Load draft data
-        with open(draft_file, 'r', encoding='utf-8') as f:
-            draft_data = json.load(f)
+        draft_data = await run_io(read_json_file, draft_file)
 
         # Debug: Print the draft data being read
         print(f"🔍 Publishing from draft for {guide_slug}:")
@@ -1105,8 +2424,7 @@ async def publish_from_draft(guide_slug: str, current_user: bool = Depends(get_c
 
         # Save tutorial.json
         tutorial_file = guide_dir / "tutorial.json"
-        with open(tutorial_file, "w", encoding="utf-8") as f:
-            json.dump(tutorial_json, f, indent=2, ensure_ascii=False)
+        await run_io(write_json_file, tutorial_file, tutorial_json)
 
         # Generate flow.json from draft
         flow_json = {
@@ -1138,13 +2456,14 @@ async def publish_from_draft(guide_slug: str, current_user: bool = Depends(get_c
 
         # Save flow.json
         flow_file = guide_dir / "flow.json"
-        with open(flow_file, "w", encoding="utf-8") as f:
-            json.dump(flow_json, f, indent=2, ensure_ascii=False)
+        await run_io(write_json_file, flow_file, flow_json)
 
-        # Regenerate HTML
-        generate_all_guides()
+        # Regenerate HTML in the background
+        invalidate_rendered_pages(guide_slug)
+        await run_io(refresh_catalog_entry, guide_slug, published=True)
+        job = enqueue_guide_rebuild(guide_slug, "publish-from-draft")
 
-        return {"status": "success", "message": "Guide published successfully from draft"}
+        return {"status": "success", "message": "Guide published successfully from draft", "job_id": job["id"]}
     except Exception as e:
         return {"status": "error", "message": f"Failed to publish guide: {str(e)}"}
 
@@ -1321,8 +2640,8 @@ def login_page():
 async def admin_dashboard(request: Request):
     """Admin dashboard page - authentication handled by client-side JavaScript"""
     # Load the admin dashboard template
-    template = get_jinja_env().get_template("admin_dashboard.html")
-    return Response(content=template.render(), media_type="text/html")
+    html = await run_io(render_admin_template, "admin_dashboard.html")
+    return Response(content=html, media_type="text/html")
 
 
 @app.get("/admin/edit-guide/{guide_slug}")
@@ -1334,7 +2653,7 @@ async def edit_guide_page(guide_slug: str, request: Request):
     # Check if this is actually a new guide creation or an existing guide with slug "new"
     guide_dir = GUIDES_DIR / guide_slug
 
-    if guide_slug == "new" and not guide_dir.exists():
+    if guide_slug == "new" and not await run_io(guide_dir.exists):
         # Create new guide template
         guide_data = {
             'tutorial': {
@@ -1351,51 +2670,42 @@ async def edit_guide_page(guide_slug: str, request: Request):
         }
     else:
         # Load existing guide data (including guides with slug "new")
-        if not guide_dir.exists():
+        if not await run_io(guide_dir.exists):
             raise HTTPException(status_code=404, detail="Guide not found")
 
             # Check if draft exists first, load from draft if available
         draft_file = guide_dir / "draft.json"
 
-        if draft_file.exists():
-            with open(draft_file, 'r', encoding='utf-8') as f:
-                draft_data = json.load(f)
-                guide_data['tutorial'] = draft_data.get('tutorial', {})
-                guide_data['flow'] = draft_data.get('flow', {})
+        if await run_io(draft_file.exists):
+            draft_data = await run_io(read_json_file, draft_file)
+            guide_data['tutorial'] = draft_data.get('tutorial', {})
+            guide_data['flow'] = draft_data.get('flow', {})
         else:
             # Load from published files if no draft exists
             tutorial_file = guide_dir / "tutorial.json"
             flow_file = guide_dir / "flow.json"
 
-            if tutorial_file.exists():
-                with open(tutorial_file, 'r', encoding='utf-8') as f:
-                    tutorial_data = json.load(f)
-                    guide_data['tutorial'] = tutorial_data.get('tutorial', {})
+            if await run_io(tutorial_file.exists):
+                tutorial_data = await run_io(read_json_file, tutorial_file)
+                guide_data['tutorial'] = tutorial_data.get('tutorial', {})
 
-            if flow_file.exists():
-                with open(flow_file, 'r', encoding='utf-8') as f:
-                    flow_data = json.load(f)
-                    guide_data['flow'] = flow_data
+            if await run_io(flow_file.exists):
+                guide_data['flow'] = await run_io(read_json_file, flow_file)
 
             # Create initial draft from published data so we can track changes
-            if tutorial_file.exists() or flow_file.exists():
+            if await run_io(tutorial_file.exists) or await run_io(flow_file.exists):
                 draft_file = guide_dir / "draft.json"
                 draft_data = {
                     'tutorial': guide_data.get('tutorial', {}),
                     'flow': guide_data.get('flow', {})
                 }
-                with open(draft_file, 'w', encoding='utf-8') as f:
-                    json.dump(draft_data, f, indent=2, ensure_ascii=False)
+                await run_io(write_json_file, draft_file, draft_data)
+                await run_io(refresh_catalog_entry, guide_slug)
 
         # Load the edit guide template
-    template = get_jinja_env().get_template("edit_guide.html")
-    return Response(
-        content=template.render(
-            guide_slug=guide_slug,
-            guide_data=guide_data
-        ),
-        media_type="text/html"
-    )
+    html = await run_io(render_admin_template, "edit_guide.html",
+                        guide_slug=guide_slug, guide_data=guide_data)
+    return Response(content=html, media_type="text/html")
 
 
 @app.get("/admin/preview-guide/{guide_slug}")
@@ -1405,13 +2715,13 @@ async def preview_guide(guide_slug: str, request: Request, current_user: bool =
 
     # Check if guide exists
     guide_dir = GUIDES_DIR / guide_slug
-    if not guide_dir.exists():
+    if not await run_io(guide_dir.exists):
         print(f"❌ Guide directory not found: {guide_dir}")
         raise HTTPException(status_code=404, detail="Guide not found")
 
     # Check if draft exists
     draft_file = guide_dir / "draft.json"
-    if not draft_file.exists():
+    if not await run_io(draft_file.exists):
         print(f"❌ Draft file not found: {draft_file}")
         raise HTTPException(
             status_code=404, detail="No draft found to preview")
@@ -1420,8 +2730,7 @@ async def preview_guide(guide_slug: str, request: Request, current_user: bool =
 
     try:
         # Load draft data
-        with open(draft_file, 'r', encoding='utf-8') as f:
-            draft_data = json.load(f)
+        draft_data = await run_io(read_json_file, draft_file)
 
         # Generate temporary tutorial.json from draft
         tutorial_json = {
@@ -1488,17 +2797,14 @@ async def preview_guide(guide_slug: str, request: Request, current_user: bool =
         temp_tutorial_file = guide_dir / "temp_tutorial.json"
         temp_flow_file = guide_dir / "temp_flow.json"
 
-        with open(temp_tutorial_file, "w", encoding="utf-8") as f:
-            json.dump(tutorial_json, f, indent=2, ensure_ascii=False)
-
-        with open(temp_flow_file, "w", encoding="utf-8") as f:
-            json.dump(flow_json, f, indent=2, ensure_ascii=False)
+        await run_io(write_json_file, temp_tutorial_file, tutorial_json)
+        await run_io(write_json_file, temp_flow_file, flow_json)
 
         # Generate temporary HTML
-        generate_guide(guide_slug, use_temp_files=True)
+        await run_io(generate_preview, guide_slug)
 
         # Check if draft still exists after generating preview
-        if draft_file.exists():
+        if await run_io(draft_file.exists):
             print(f"✅ Draft file still exists after preview generation")
         else:
             print(f"❌ Draft file was deleted during preview generation!")
@@ -1525,12 +2831,8 @@ async def clear_preview(guide_slug: str, request: Request, current_user: bool =
         temp_flow_file = guide_dir / "temp_flow.json"
         temp_html_file = guide_dir / "temp_tutorial.html"
 
-        if temp_tutorial_file.exists():
-            temp_tutorial_file.unlink()
-        if temp_flow_file.exists():
-            temp_flow_file.unlink()
-        if temp_html_file.exists():
-            temp_html_file.unlink()
+        for temp_file in (temp_tutorial_file, temp_flow_file, temp_html_file):
+            await run_io(temp_file.unlink, missing_ok=True)
 
         return {"status": "success", "message": "Preview cleared"}
     except Exception as e:
@@ -1542,57 +2844,16 @@ async def regenerate_single_guide(guide_slug: str, current_user: bool = Depends(
     """Regenerate a specific guide for testing"""
     try:
         guide_path = GUIDES_DIR / guide_slug
-        if not guide_path.exists():
+        if not await run_io(guide_path.exists):
             return {"status": "error", "message": f"Guide '{guide_slug}' not found"}
 
         # Force regeneration by calling the generation logic directly
-        tutorial_json = guide_path / "tutorial.json"
-        flow_json = guide_path / "flow.json"
-        tutorial_html = guide_path / "tutorial.html"
-        flow_html = guide_path / "flow.html"
-
-        if tutorial_json.exists():
-            with open(tutorial_json, encoding="utf-8") as f:
-                data = json.load(f)
-            tutorial = data.get("tutorial", {})
-            assets = data.get("assets", {}) or {}
-            if 'assets' in assets:
-                assets = assets['assets']
-            css_links = "\n".join(
-                f"<link rel='stylesheet' href='{href}'>" for href in assets.get("css", []) or [])
-            js_links = "\n".join(
-                f"<script src='{src}' defer></script>" for src in assets.get("js", []) or [])
-            total_steps = sum(len(p["steps"])
-                              for p in tutorial.get("phases", []))
-
-            # Generate flow content if flow.json exists
-            flow_content = ""
-            flow_data = None
-            if flow_json.exists():
-                try:
-                    with open(flow_json, encoding="utf-8") as f:
-                        flow_data = json.load(f)
-                    flow_content = f'<div id="flow-data" data-flow="{json.dumps(flow_data)}"></div>'
-                    print(
-                        f"✅ Loaded flow data for {guide_slug}: {len(flow_data.get('phases', []))} phases")
-                except Exception as e:
-                    print(f"❌ Error loading flow data for {guide_slug}: {e}")
-            else:
-                print(f"⚠️ No flow.json found for {guide_slug}")
-
-            templates = get_templates()
-            rendered_html = templates["tutorial"].render(
-                title=tutorial.get("title", ""),
-                description=tutorial.get("description", ""),
-                css_links=css_links,
-                js_links=js_links,
-                tutorial_data=tutorial,
-                total_steps=total_steps,
-                flow_content=flow_content,
-                flow_data=flow_data,
-                tutorial_data_json=json.dumps(tutorial),
-            )
-            tutorial_html.write_text(rendered_html, encoding="utf-8")
+        if await run_io((guide_path / "tutorial.json").exists):
+            inputs = await run_io(build_guide, guide_slug)
+            await run_io(update_build_manifest, {guide_slug: inputs})
+            invalidate_rendered_pages(guide_slug)
+            await run_io(reload_catalog_entry, guide_slug)
+            await run_io(update_search_index, guide_slug)
             print(f"✅ Regenerated tutorial for {guide_slug}")
             return {"status": "success", "message": f"Guide {guide_slug} regenerated successfully"}
         else:
@@ -1611,12 +2872,12 @@ async def check_slug_availability(slug: str, current_user: bool = Depends(get_cu
             return {
                 "available": False,
                 "error": error_msg,
-                "suggestions": [generate_unique_slug(slug)]
+                "suggestions": [await run_io(generate_unique_slug, slug)]
             }
 
         # Check if slug exists
         guide_dir = GUIDES_DIR / slug
-        if guide_dir.exists():
+        if await run_io(guide_dir.exists):
             # Generate suggestions
             suggestions = []
             for i in range(1, 6):  # Generate 5 suggestions
@@ -1643,12 +2904,16 @@ async def delete_guide(guide_slug: str, current_user: bool = Depends(get_current
     """Delete a guide"""
     try:
         guide_dir = GUIDES_DIR / guide_slug
-        if not guide_dir.exists():
+        if not await run_io(guide_dir.exists):
             raise HTTPException(status_code=404, detail="Guide not found")
 
         # Remove the entire guide directory
         import shutil
-        shutil.rmtree(guide_dir)
+        await run_io(shutil.rmtree, guide_dir)
+        invalidate_rendered_pages(guide_slug)
+        await run_io(update_build_manifest, {guide_slug: None})
+        await run_io(refresh_catalog_entry, guide_slug)
+        await run_io(search_index.remove_guide, guide_slug)
 
         return {"message": f"Guide {guide_slug} deleted successfully"}
     except Exception as e:
@@ -1661,57 +2926,16 @@ async def test_regenerate_guide(guide_slug: str):
     """Simple endpoint to regenerate a guide without authentication"""
     try:
         guide_path = GUIDES_DIR / guide_slug
-        if not guide_path.exists():
+        if not await run_io(guide_path.exists):
             return {"status": "error", "message": f"Guide '{guide_slug}' not found"}
 
         # Force regeneration by calling the generation logic directly
-        tutorial_json = guide_path / "tutorial.json"
-        flow_json = guide_path / "flow.json"
-        tutorial_html = guide_path / "tutorial.html"
-        flow_html = guide_path / "flow.html"
-
-        if tutorial_json.exists():
-            with open(tutorial_json, encoding="utf-8") as f:
-                data = json.load(f)
-            tutorial = data.get("tutorial", {})
-            assets = data.get("assets", {}) or {}
-            if 'assets' in assets:
-                assets = assets['assets']
-            css_links = "\n".join(
-                f"<link rel='stylesheet' href='{href}'>" for href in assets.get("css", []) or [])
-            js_links = "\n".join(
-                f"<script src='{src}' defer></script>" for src in assets.get("js", []) or [])
-            total_steps = sum(len(p["steps"])
-                              for p in tutorial.get("phases", []))
-
-            # Generate flow content if flow.json exists
-            flow_content = ""
-            flow_data = None
-            if flow_json.exists():
-                try:
-                    with open(flow_json, encoding="utf-8") as f:
-                        flow_data = json.load(f)
-                    flow_content = f'<div id="flow-data" data-flow="{json.dumps(flow_data)}"></div>'
-                    print(
-                        f"✅ Loaded flow data for {guide_slug}: {len(flow_data.get('phases', []))} phases")
-                except Exception as e:
-                    print(f"❌ Error loading flow data for {guide_slug}: {e}")
-            else:
-                print(f"⚠️ No flow.json found for {guide_slug}")
-
-            templates = get_templates()
-            rendered_html = templates["tutorial"].render(
-                title=tutorial.get("title", ""),
-                description=tutorial.get("description", ""),
-                css_links=css_links,
-                js_links=js_links,
-                tutorial_data=tutorial,
-                total_steps=total_steps,
-                flow_content=flow_content,
-                flow_data=flow_data,
-                tutorial_data_json=json.dumps(tutorial),
-            )
-            tutorial_html.write_text(rendered_html, encoding="utf-8")
+        if await run_io((guide_path / "tutorial.json").exists):
+            inputs = await run_io(build_guide, guide_slug)
+            await run_io(update_build_manifest, {guide_slug: inputs})
+            invalidate_rendered_pages(guide_slug)
+            await run_io(reload_catalog_entry, guide_slug)
+            await run_io(update_search_index, guide_slug)
             print(f"✅ Regenerated tutorial for {guide_slug}")
             return {"status": "success", "message": f"Guide {guide_slug} regenerated successfully"}
         else:
@@ -0,0 +1,150 @@
+import hashlib
+import html
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+try:
+    import pygments
+    from pygments.lexers import get_lexer_by_name
+    from pygments.token import Comment, Keyword, Literal, Name, Operator, String
+    from pygments.util import ClassNotFound
+except ImportError:
+    pygments = None
+
+
+# Bump when the stored HTML format changes so old cache entries are ignored
+CACHE_FORMAT_VERSION = 2
+
+# Token types mapped to the classes styled in static/css/highlight.css, which
+# follow the colors of the Prism theme used for browser highlighting. Other
+# tokens take the code's default color and get no span, which keeps
+# highlighted pages close to the size of the plain ones.
+if pygments is not None:
+    TOKEN_CLASSES = {
+        Comment: "c",
+        Keyword: "k",
+        Keyword.Constant: "l",
+        Operator.Word: "k",
+        Name.Builtin: "b",
+        Name.Function: "f",
+        Name.Class: "y",
+        Name.Constant: "y",
+        Name.Decorator: "f",
+        Name.Tag: "t",
+        Name.Attribute: "t",
+        Literal.Number: "m",
+        String: "s",
+    }
+
+# Prism language names used by the templates, mapped to Pygments lexer names
+LEXER_NAMES = {
+    "markup": "html",
+    "plaintext": "text",
+}
+
+
+class SnippetHighlighter:
+    def __init__(self, cache_dir: str = "highlight_cache", enabled: bool = True, max_memory_entries: int = 2048):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled and pygments is not None
+        self.max_memory_entries = max_memory_entries
+        self.memory_cache = OrderedDict()
+        self.lock = threading.Lock()
+
+        if enabled and pygments is None:
+            print("⚠️ Pygments is not installed, code snippets will be highlighted in the browser")
+
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def cache_key(self, code: str, language: str) -> str:
+        """Content address of a highlighted snippet"""
+        # The Pygments version is part of the key so upgrades re-highlight
+        key_source = f"{CACHE_FORMAT_VERSION}\0{pygments.__version__}\0{language}\0{code}"
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+    def highlight(self, code: str, language: str) -> Optional[str]:
+        """
+        Return highlighted HTML for a code snippet
+        Returns None if server-side highlighting is disabled
+        """
+        if not self.enabled:
+            return None
+
+        key = self.cache_key(code, language)
+        with self.lock:
+            if key in self.memory_cache:
+                self.memory_cache.move_to_end(key)
+                return self.memory_cache[key]
+
+        cache_file = self.cache_dir / key[:2] / f"{key}.html"
+        try:
+            html = cache_file.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            html = self.render(code, language)
+            try:
+                cache_file.parent.mkdir(exist_ok=True)
+                temp_file = cache_file.with_name(
+                    f".{cache_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                temp_file.write_text(html, encoding="utf-8")
+                os.replace(temp_file, cache_file)
+            except OSError as e:
+                print(f"❌ Error writing highlight cache: {e}")
+
+        with self.lock:
+            self.memory_cache[key] = html
+            while len(self.memory_cache) > self.max_memory_entries:
+                self.memory_cache.popitem(last=False)
+        return html
+
+    def render(self, code: str, language: str) -> str:
+        """Highlight a snippet with Pygments, one span per run of same-colored tokens"""
+        lexer_name = LEXER_NAMES.get(language, language)
+        try:
+            lexer = get_lexer_by_name(lexer_name, stripnl=False, ensurenl=False)
+        except ClassNotFound:
+            lexer = get_lexer_by_name("text", stripnl=False, ensurenl=False)
+
+        parts = []
+        run_class = None
+        run_text = []
+        pending_space = ""
+
+        def close_run():
+            if run_text:
+                parts.append(f'<span class="{run_class}">{html.escape("".join(run_text), quote=False)}</span>')
+                run_text.clear()
+
+        for token_type, value in lexer.get_tokens(code):
+            if value.isspace():
+                # Whitespace can join the run around it if the next token continues it
+                pending_space += value
+                continue
+            token_class = token_class_for(token_type)
+            if token_class is not None and token_class == run_class and run_text:
+                run_text.append(pending_space)
+            else:
+                close_run()
+                parts.append(html.escape(pending_space, quote=False))
+                run_class = token_class
+            pending_space = ""
+            if token_class is None:
+                parts.append(html.escape(value, quote=False))
+            else:
+                run_text.append(value)
+        close_run()
+        parts.append(html.escape(pending_space, quote=False))
+        return "".join(parts)
+
+
+def token_class_for(token_type) -> Optional[str]:
+    """Class of the closest token type in TOKEN_CLASSES, or None for the default color"""
+    while token_type is not None:
+        token_class = TOKEN_CLASSES.get(token_type)
+        if token_class is not None:
+            return token_class
+        token_type = token_type.parent
+    return None
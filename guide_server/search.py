@@ -0,0 +1,277 @@
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from html import escape
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+# Bump when the segment format or tokenizer changes so old segments are rebuilt
+INDEX_FORMAT_VERSION = 1
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+    "it", "its", "of", "on", "or", "that", "the", "this", "to", "we", "will",
+    "with", "you", "your",
+}
+
+# Title terms count this many times, so matches in titles rank higher
+TITLE_WEIGHT = 2
+
+# Words shown in a result snippet
+SNIPPET_WORDS = 30
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of a text, without stop words"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def get_guide_documents(tutorial: Dict[str, Any], flow: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Split a guide into searchable sections: the guide itself, phases, steps and flow steps"""
+    documents = [{
+        "kind": "guide",
+        "ref": "",
+        "title": tutorial.get("title", ""),
+        "text": tutorial.get("description", ""),
+    }]
+
+    for phase in tutorial.get("phases") or []:
+        phase_number = phase.get("phase", "")
+        documents.append({
+            "kind": "phase",
+            "ref": str(phase_number),
+            "title": phase.get("title", ""),
+            "text": phase.get("description", ""),
+        })
+        for step_index, step in enumerate(phase.get("steps") or [], start=1):
+            documents.append({
+                "kind": "step",
+                # Matches the data-step-id of the step on the tutorial page
+                "ref": f"{phase_number}-{step_index}",
+                "title": step.get("title", ""),
+                "text": " ".join(filter(None, [step.get("description", ""), step.get("file", "")])),
+            })
+
+    for phase in flow.get("phases") or []:
+        for step in phase.get("steps") or []:
+            location = step.get("location") or {}
+            documents.append({
+                "kind": "flow_step",
+                "ref": f"{phase.get('phase', '')}-{step.get('step', '')}",
+                "title": step.get("title", ""),
+                "text": " ".join(filter(None, [step.get("description", ""), location.get("file", "")])),
+            })
+
+    return [document for document in documents if document["title"] or document["text"]]
+
+
+class SearchIndex:
+    """
+    Inverted index over guide sections, ranked with BM25
+
+    Each guide is stored on disk as its own segment file, so updating a guide
+    rewrites only that guide's segment. Segments hold per-section term
+    frequencies and are merged into the in-memory postings when loaded.
+    """
+
+    def __init__(self, index_dir: str = "search_index", k1: float = 1.2, b: float = 0.75):
+        self.index_dir = Path(index_dir)
+        self.k1 = k1
+        self.b = b
+        self.lock = threading.RLock()
+        # {doc_id: section}, {term: {doc_id: term_frequency}}
+        self.documents = {}
+        self.postings = {}
+        # {guide_slug: {"title", "source_hash", "doc_ids"}}
+        self.guides = {}
+        self.next_doc_id = 0
+        self.total_length = 0
+        # BM25 length normalization per section, recomputed after the index changes
+        self.length_norms = None
+        self.loaded = False
+
+    def segment_file(self, guide_slug: str) -> Path:
+        return self.index_dir / f"{guide_slug}.json"
+
+    def load(self):
+        """Load every segment from disk into memory"""
+        with self.lock:
+            if self.loaded:
+                return
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            for segment_file in self.index_dir.glob("*.json"):
+                try:
+                    with open(segment_file, encoding="utf-8") as f:
+                        segment = json.load(f)
+                except Exception as e:
+                    print(f"⚠️ Could not read search segment {segment_file.name}: {e}")
+                    continue
+                if segment.get("version") == INDEX_FORMAT_VERSION:
+                    self.add_segment(segment)
+            self.loaded = True
+            print(f"🔎 Search index loaded: {len(self.guides)} guides, {len(self.documents)} sections")
+
+    def get_source_hash(self, guide_slug: str) -> Optional[str]:
+        """Hash of the guide content the index was built from"""
+        with self.lock:
+            guide = self.guides.get(guide_slug)
+            return guide["source_hash"] if guide else None
+
+    def get_indexed_guides(self) -> List[str]:
+        with self.lock:
+            return list(self.guides)
+
+    def update_guide(self, guide_slug: str, tutorial: Dict[str, Any], flow: Dict[str, Any], source_hash: str):
+        """Re-index one guide and write its segment"""
+        sections = []
+        for document in get_guide_documents(tutorial, flow):
+            terms = Counter(tokenize(document["text"]))
+            for term in tokenize(document["title"]):
+                terms[term] += TITLE_WEIGHT
+            sections.append(dict(document, terms=dict(terms), length=sum(terms.values())))
+
+        segment = {
+            "version": INDEX_FORMAT_VERSION,
+            "slug": guide_slug,
+            "title": tutorial.get("title", guide_slug),
+            "source_hash": source_hash,
+            "sections": sections,
+        }
+        with self.lock:
+            self.remove_segment(guide_slug)
+            self.add_segment(segment)
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        segment_file = self.segment_file(guide_slug)
+        temp_file = segment_file.with_name(
+            f".{segment_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            temp_file.write_text(json.dumps(segment, ensure_ascii=False), encoding="utf-8")
+            os.replace(temp_file, segment_file)
+        except OSError as e:
+            print(f"❌ Error writing search segment for {guide_slug}: {e}")
+
+    def remove_guide(self, guide_slug: str):
+        """Drop a guide from the index and delete its segment"""
+        with self.lock:
+            self.remove_segment(guide_slug)
+        self.segment_file(guide_slug).unlink(missing_ok=True)
+
+    def add_segment(self, segment: Dict[str, Any]):
+        self.length_norms = None
+        doc_ids = []
+        for section in segment["sections"]:
+            doc_id = self.next_doc_id
+            self.next_doc_id += 1
+            self.documents[doc_id] = dict(section, slug=segment["slug"])
+            self.total_length += section["length"]
+            for term, frequency in section["terms"].items():
+                self.postings.setdefault(term, {})[doc_id] = frequency
+            doc_ids.append(doc_id)
+        self.guides[segment["slug"]] = {
+            "title": segment["title"],
+            "source_hash": segment["source_hash"],
+            "doc_ids": doc_ids,
+        }
+
+    def remove_segment(self, guide_slug: str):
+        guide = self.guides.pop(guide_slug, None)
+        if guide is None:
+            return
+        self.length_norms = None
+        for doc_id in guide["doc_ids"]:
+            section = self.documents.pop(doc_id)
+            self.total_length -= section["length"]
+            for term in section["terms"]:
+                term_postings = self.postings[term]
+                del term_postings[doc_id]
+                if not term_postings:
+                    del self.postings[term]
+
+    def search(self, query: str, limit: int = 10, guide_slug: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Rank sections matching any query term, best first"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self.lock:
+            total_documents = len(self.documents)
+            if not total_documents:
+                return []
+            if self.length_norms is None:
+                average_length = self.total_length / total_documents
+                self.length_norms = {
+                    doc_id: self.k1 * (1 - self.b + self.b * section["length"] / average_length)
+                    for doc_id, section in self.documents.items()}
+            length_norms = self.length_norms
+            k1_plus_one = self.k1 + 1
+
+            scores = {}
+            for term in terms:
+                term_postings = self.postings.get(term)
+                if not term_postings:
+                    continue
+                frequency = len(term_postings)
+                idf = math.log(1 + (total_documents - frequency + 0.5) / (frequency + 0.5))
+                if guide_slug is not None:
+                    guide_doc_ids = self.guides.get(guide_slug, {"doc_ids": []})["doc_ids"]
+                    term_postings = {doc_id: term_postings[doc_id]
+                                     for doc_id in guide_doc_ids if doc_id in term_postings}
+                for doc_id, term_frequency in term_postings.items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * term_frequency * k1_plus_one / (
+                        term_frequency + length_norms[doc_id])
+
+            results = []
+            for doc_id, score in heapq.nlargest(limit, scores.items(), key=lambda item: item[1]):
+                section = self.documents[doc_id]
+                results.append({
+                    "slug": section["slug"],
+                    "guide_title": self.guides[section["slug"]]["title"],
+                    "kind": section["kind"],
+                    "ref": section["ref"],
+                    "title": section["title"],
+                    "title_html": highlight_terms(section["title"], terms),
+                    "snippet_html": make_snippet(section["text"], terms),
+                    "score": round(score, 4),
+                })
+            return results
+
+
+def highlight_terms(text: str, terms: List[str]) -> str:
+    """HTML-escape a text and wrap words matching the query terms in <mark>"""
+    parts = []
+    position = 0
+    for match in TOKEN_PATTERN.finditer(text):
+        if match.group().lower() in terms:
+            parts.append(escape(text[position:match.start()]))
+            parts.append(f"<mark>{escape(match.group())}</mark>")
+            position = match.end()
+    parts.append(escape(text[position:]))
+    return "".join(parts)
+
+
+def make_snippet(text: str, terms: List[str]) -> str:
+    """Highlighted excerpt of a text around its densest run of query terms"""
+    words = list(TOKEN_PATTERN.finditer(text))
+    if not words:
+        return ""
+
+    # Start the window where it covers the most matching words
+    matches = [index for index, word in enumerate(words) if word.group().lower() in terms]
+    start = 0
+    if matches:
+        best = max(matches, key=lambda first: sum(1 for index in matches if first <= index < first + SNIPPET_WORDS))
+        start = max(0, best - 3)
+    end = min(len(words), start + SNIPPET_WORDS)
+
+    excerpt = text[words[start].start():words[end - 1].end()]
+    prefix = "… " if start > 0 else ""
+    suffix = " …" if end < len(words) else ""
+    return prefix + highlight_terms(excerpt, terms) + suffix
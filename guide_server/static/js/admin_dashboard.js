@@ -35,6 +35,7 @@ function displayGuides(guides) {
   guidesGrid.innerHTML = '';
 
   guides.forEach((guide) => {
+    guideDataCache[guide.slug] = guide;
     const card = createGuideCard(guide);
     guidesGrid.appendChild(card);
   });
@@ -48,12 +49,10 @@ function createGuideCard(guide) {
   card.setAttribute('data-expanded', 'false');
   card.setAttribute('data-current-view', 'published');
 
-  // Calculate stats
-  const totalSteps =
-    guide.tutorial?.phases?.reduce((total, phase) => total + (phase.steps?.length || 0), 0) || 0;
-  const totalPhases = guide.tutorial?.phases?.length || 0;
-  const flowSteps =
-    guide.flow?.phases?.reduce((total, phase) => total + (phase.steps?.length || 0), 0) || 0;
+  // Stats are counted by the server
+  const totalSteps = guide.step_count || 0;
+  const totalPhases = guide.phase_count || 0;
+  const flowSteps = guide.flow_step_count || 0;
 
   // Determine which badges to show
   const hasPublished = guide.has_published;
@@ -199,7 +198,7 @@ async function switchGuideData(slug, type) {
   // Load data if not cached
   if (!guideDataCache[slug]) {
     try {
-      const response = await fetch(`/guides/api/guides`);
+      const response = await fetch(`/guides/api/guides?slug=${encodeURIComponent(slug)}`);
       const data = await response.json();
       const guide = data.guides.find((g) => g.slug === slug);
       if (guide) {
@@ -226,12 +225,10 @@ async function switchGuideData(slug, type) {
       descriptionElement.textContent = guide.description || 'No description available';
 
     // Update stats for published data
-    if (statsElement && guide.tutorial) {
-      const totalSteps =
-        guide.tutorial.phases?.reduce((total, phase) => total + (phase.steps?.length || 0), 0) || 0;
-      const totalPhases = guide.tutorial.phases?.length || 0;
-      const flowSteps =
-        guide.flow?.phases?.reduce((total, phase) => total + (phase.steps?.length || 0), 0) || 0;
+    if (statsElement && (guide.has_published || guide.has_draft)) {
+      const totalSteps = guide.step_count || 0;
+      const totalPhases = guide.phase_count || 0;
+      const flowSteps = guide.flow_step_count || 0;
 
       statsElement.innerHTML = `
         <div class="stat">
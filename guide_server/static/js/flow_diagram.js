@@ -184,7 +184,19 @@ class FlowDiagram {
 }
 
 // Initialize the flow diagram when the page loads
-document.addEventListener('DOMContentLoaded', () => {
+document.addEventListener('DOMContentLoaded', async () => {
+  // Published pages fetch their flow data (preloaded in <head>) instead of embedding it
+  if (!window.flowData && window.flowDataUrl) {
+    try {
+      const response = await fetch(window.flowDataUrl);
+      if (response.ok) {
+        window.flowData = await response.json();
+      }
+    } catch (error) {
+      console.error('Failed to load flow data:', error);
+    }
+  }
+
   if (window.flowData) {
     new FlowDiagram();
   }
@@ -849,13 +849,35 @@ function countTotalSteps(data) {
   return data.phases.reduce((total, phase) => total + phase.steps.length, 0);
 }
 
+// Load guide data from its data endpoint
+async function fetchGuideData(url) {
+  try {
+    const response = await fetch(url);
+    if (!response.ok) {
+      throw new Error(`HTTP ${response.status}`);
+    }
+    return await response.json();
+  } catch (error) {
+    console.error('Failed to load guide data:', error);
+    return null;
+  }
+}
+
 // Initialize
 document.addEventListener('DOMContentLoaded', async function () {
+  // Published pages fetch their tutorial data (preloaded in <head>) instead of embedding it
+  const tutorialDataRequest =
+    window.tutorialData || !window.tutorialDataUrl
+      ? Promise.resolve(window.tutorialData)
+      : fetchGuideData(window.tutorialDataUrl).then((data) => data?.tutorial || null);
+
   // Check authentication first
   await checkAuth();
   updateEditButtonsVisibility();
 
-  // Use the tutorial data that's already available globally from Jinja template
+  window.tutorialData = await tutorialDataRequest;
+
+  // Use the tutorial data that's now available globally
   if (window.tutorialData) {
     tutorialData = window.tutorialData;
     totalSteps = window.totalSteps || countTotalSteps(tutorialData);